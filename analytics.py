@@ -0,0 +1,92 @@
+import numpy as np
+from datetime import date
+
+# Contribution analytics -- every function works on a (days x users) count matrix,
+# so a whole team is computed at once instead of looping per user.
+
+
+def contribution_matrix(days_by_user, dates):
+    """Stack per-user {date: count} dicts into a (days x users) matrix."""
+    matrix = np.zeros((len(dates), len(days_by_user)), dtype=np.int64)
+
+    for col, days in enumerate(days_by_user):
+        matrix[:, col] = np.fromiter((days.get(day, 0) for day in dates), dtype=np.int64, count=len(dates))
+
+    return matrix
+
+def run_lengths(matrix):
+    """Length of the active streak ending on each day (0 on days without contributions)."""
+    active = matrix > 0
+    counts = np.cumsum(active, axis=0)
+    resets = np.maximum.accumulate(np.where(active, 0, counts), axis=0)
+
+    return counts - resets
+
+def streaks(matrix):
+    """(current, longest) streak per user. Today without contributions doesn't break the current streak yet."""
+    if not len(matrix):
+        empty = np.zeros(matrix.shape[1], dtype=np.int64)
+        return empty, empty
+
+    runs = run_lengths(matrix)
+    current = runs[-1] if len(runs) == 1 else np.where(matrix[-1] > 0, runs[-1], runs[-2])
+
+    return current, runs.max(axis=0)
+
+def rolling_average(matrix, window):
+    """Trailing <window>-day average per user; the first days average over what is available."""
+    sums = np.cumsum(matrix, axis=0, dtype=np.float64)
+    sums[window:] = sums[window:] - sums[:-window]
+    divisor = np.minimum(np.arange(1, len(matrix) + 1), window)[:, None]
+
+    return sums / divisor
+
+def weekday_distribution(matrix, dates):
+    """Share of each user's contributions per weekday -- (7 x users), Monday first."""
+    weekdays = np.array([date.fromisoformat(day).weekday() for day in dates], dtype=np.int64)
+
+    distribution = np.zeros((7, matrix.shape[1]), dtype=np.float64)
+    np.add.at(distribution, weekdays, matrix)
+
+    totals = distribution.sum(axis=0)
+    return distribution / np.where(totals == 0, 1, totals)
+
+def percentile_rank(values):
+    """Percentile of each value within the team (ties count half)."""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return values
+
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side='left')
+    equal = np.searchsorted(ordered, values, side='right') - below
+
+    return 100.0 * (below + 0.5 * equal) / len(values)
+
+def team_summary(logins, days_by_user, dates, window=7, series=False):
+    """Per-user stats for a team, computed over one (days x users) matrix."""
+    matrix = contribution_matrix(days_by_user, dates)
+
+    totals = matrix.sum(axis=0)
+    current, longest = streaks(matrix)
+    rolling = rolling_average(matrix, window)
+    weekdays = weekday_distribution(matrix, dates)
+    percentiles = percentile_rank(totals)
+    active_days = (matrix > 0).sum(axis=0)
+
+    summary = {}
+    for col, login in enumerate(logins):
+        summary[login] = {
+            "total": int(totals[col]),
+            "active_days": int(active_days[col]),
+            "current_streak": int(current[col]),
+            "longest_streak": int(longest[col]),
+            "rolling_average": round(float(rolling[-1, col]), 2) if len(dates) else 0.0,
+            "weekday_distribution": [round(float(share), 4) for share in weekdays[:, col]],
+            "percentile": round(float(percentiles[col]), 1),
+        }
+
+        if series:
+            summary[login]["rolling_series"] = [round(float(value), 2) for value in rolling[:, col]]
+
+    return summary
@@ -1,20 +1,57 @@
 import os
-import requests
-import pandas as pd
+import copy
+import socket
+import json
+import zlib
+import hmac
+import hashlib
+import threading
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, Flask, Response, render_template, request, redirect, url_for, jsonify, stream_with_context
 from datetime import datetime,timedelta
+from urllib.parse import urlparse, parse_qs
+
+import export
+from clients import GitHubUnavailable, LazyCollection, get_db, get_http, get_timings, reset_timings
 
 # Load GitHub token from environment variable
 load_dotenv()
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-MONGO_URI = os.getenv('MONGO_URI')
+
+# 'user' scans a repo once per user, 'repo' scans it once and serves every user from a shared index
+INGESTION_MODE = os.getenv('INGESTION_MODE', 'user')
+REPO_SCAN_INTERVAL = int(os.getenv('REPO_SCAN_INTERVAL', 300))  # Seconds between incremental repo scans
+
+# 'full' fetches every commit by SHA (with files), 'lite' pulls commit stats from GraphQL history, 100 per call
+COMMIT_MODE = os.getenv('COMMIT_MODE', 'full')
+
+REPO_LIST_TTL = int(os.getenv('REPO_LIST_TTL', 10))          # Minutes a user's repo listing is cached
+REPO_LIST_WORKERS = int(os.getenv('REPO_LIST_WORKERS', 4))   # Concurrent page fetches for repo listings
+
+CONTRIBUTIONS_TTL = int(os.getenv('CONTRIBUTIONS_TTL', 6))  # Hours before the latest calendar days are refetched
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 500))  # Mongo cursor batch size while exporting
+
+REFRESH_FRESH_FOR = int(os.getenv('REFRESH_FRESH_FOR', 15))  # Minutes a refreshed repo is served without polling events
+
+CHANGE_LOG_LIMIT = int(os.getenv('CHANGE_LOG_LIMIT', 1000))  # Changes kept per (user, repo) for ?since_version=
+CHANGE_GAP_TIMEOUT = int(os.getenv('CHANGE_GAP_TIMEOUT', 60))  # Seconds a missing version may still be in flight before it counts as lost
+
+LOGIN_CACHE_TTL = int(os.getenv('LOGIN_CACHE_TTL', 30))  # Days an email -> login mapping is kept
+LOGIN_MISS_TTL = int(os.getenv('LOGIN_MISS_TTL', 24))    # Hours an unresolved email is kept
+
+GITHUB_WEBHOOK_SECRET = os.getenv('GITHUB_WEBHOOK_SECRET')
+WEBHOOK_MAX_SILENCE = int(os.getenv('WEBHOOK_MAX_SILENCE', 7))  # Days without deliveries before polling resumes
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', 5))    # Failed applies before a delivery is given up (polling resumes)
+WEBHOOK_CLAIM_TIMEOUT = int(os.getenv('WEBHOOK_CLAIM_TIMEOUT', 300))  # Seconds before a delivery claimed by a crashed worker is retried
 
 
 
 # Base URL and headers for GitHub API requests
-BASE_URL = "https://api.github.com"
+BASE_URL = os.getenv('GITHUB_API_URL', "https://api.github.com")  # Overridable for local stand-ins (see loadtest.py)
 HEADERS = {
     "Authorization": f"Bearer {GITHUB_TOKEN}",
     "Accept": "application/vnd.github+json",
@@ -29,39 +66,208 @@ github_events = {
 
 
 
-# MongoDB connection
-client = MongoClient(MONGO_URI)  
-db = client['dashboard']  
-collection = db['github_data'] 
+# MongoDB collections -- connected lazily on first use, per worker process
+collection = LazyCollection('github_data')
+repo_index = LazyCollection('repo_index')    # Shared PRs / issues / comments per repo
+repo_scans = LazyCollection('repo_scans')    # Scan cursor per repo
+login_cache = LazyCollection('login_cache')  # Email -> login
+repo_lists = LazyCollection('repo_lists')    # Cached repo listing per user
+contribution_days = LazyCollection('contribution_days')  # Contribution count per user per day
+refresh_queue = LazyCollection('refresh_queue')  # Views / refreshes / activity per (user, repo)
+change_log = LazyCollection('change_log')            # Versioned changes per (user, repo)
+change_counters = LazyCollection('change_counters')  # Latest / oldest served version per (user, repo)
+commit_files = LazyCollection('commit_files')  # Compressed file stats + full message per commit
+webhook_repos = LazyCollection('webhook_repos')              # Repos with a webhook installed
+webhook_deliveries = LazyCollection('webhook_deliveries')    # Pending / applied deliveries by delivery id
 
 
 # FLASK APP ---------------------
-app = Flask(__name__)
+routes = Blueprint('dashboard', __name__)
+
+@routes.errorhandler(GitHubUnavailable)
+def github_unavailable(e):
+    # Nothing was stored -- the same request can be repeated once GitHub recovers
+    response = jsonify({"error": f"GitHub is unavailable, try again later -- {e}"})
+    if e.retry_after:
+        response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+
+    return response, 503
+
+def create_app():
+    app = Flask(__name__)
+    app.register_blueprint(routes)
+
+    # Where each request spent its time -- read by loadtest.py
+    if os.getenv('TIMING_HEADERS', 'false').lower() == 'true':
+
+        @app.before_request
+        def start_timing():
+            reset_timings()
+
+        @app.after_request
+        def add_timing_headers(response):
+            timings = get_timings()
+            response.headers['Server-Timing'] = ", ".join(f"{kind};dur={seconds * 1000:.1f}" for kind, seconds in timings.items())
+            response.headers['X-Worker-Pid'] = str(os.getpid())
+            return response
+
+    return app
+
+def warm_up():
+    """Pre-load connections and hot caches of a freshly forked worker."""
+    try:
+        get_db().command('ping')
+        ensure_indexes()
+        warm_login_cache()
+        import analytics  # numpy
+        print(f"Worker {os.getpid()} Warmed Up")
+    except Exception as e:
+        print(f"Warm Up Failed -- {e}")
+
+def start_warm_up():
+    # In the background -- a slow Mongo must not delay the worker from serving
+    threading.Thread(target=warm_up, daemon=True).start()
 
 
 # DATE FUNCTION ------------>
 
 def get_start_date():
 
-    today = datetime.today()
+    # Midnight -- the same default all day, and comparable to ?since= dates
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
     one_year_back = today - timedelta(days=365)
 
     return one_year_back
 
+def to_github_timestamp(date):
+    return date.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def get_request_window(args):
+    """(since, until) from ?since=YYYY-MM-DD&until=YYYY-MM-DD -- until is inclusive, None is up to now."""
+    since = datetime.strptime(args['since'], "%Y-%m-%d") if args.get('since') else get_start_date()
+    until = datetime.strptime(args['until'], "%Y-%m-%d") + timedelta(days=1) if args.get('until') else None
+
+    if until and since >= until:
+        raise ValueError("'since' is after 'until'")
+
+    return since, until
+
 # USER BASE FUNCTIONS ------------------------------->
 
+def is_email(username):
+    return '@' in username and '.' in username
+
+def cache_login(email, login):
+    """Remember the login of an email; login=None records a miss."""
+    ttl = timedelta(days=LOGIN_CACHE_TTL) if login else timedelta(hours=LOGIN_MISS_TTL)
+
+    login_cache.update_one(
+        {'_id': email.lower()},
+        {'$set': {'login': login, 'expires_at': datetime.utcnow() + ttl}},
+        upsert=True
+    )
+
+def get_cached_logins(emails):
+    """Unexpired cache entries as {email: login or None}."""
+    cursor = login_cache.find({
+        '_id': {'$in': [email.lower() for email in emails]},
+        'expires_at': {'$gt': datetime.utcnow()}
+    })
+    return {doc['_id']: doc['login'] for doc in cursor}
+
+def get_deployment_id():
+    # Workers of one gunicorn master share its pid
+    return os.getenv('DEPLOYMENT_ID') or f"{socket.gethostname()}:{os.getppid()}"
+
+def warm_login_cache():
+    """Seed the cache from public emails of users already in the database -- once per deployment (see warm_up)."""
+    deployment = get_deployment_id()
+
+    # The marker has no expires_at, and no email lacks an '@'
+    try:
+        login_cache.find_one_and_update(
+            {'_id': '#warmed', 'deployment': {'$ne': deployment}},
+            {'$set': {'deployment': deployment, 'warmed_at': datetime.utcnow()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return  # Another worker of this deployment did it
+
+    for doc in collection.find({"user_info.email": {"$ne": None}}, {"user_info.login": 1, "user_info.email": 1}):
+        user_info = doc.get('user_info', {})
+        if user_info.get('email') and user_info.get('login'):
+            cache_login(user_info['email'], user_info['login'])
+
+def search_logins(emails):
+    """Resolve a batch of emails with a single GraphQL call (one aliased search per email)."""
+    searches = "\n".join(
+        f'e{idx}: search(query: $q{idx}, type: USER, first: 1) {{ nodes {{ ... on User {{ login }} }} }}'
+        for idx in range(len(emails))
+    )
+    variables = ", ".join(f"$q{idx}: String!" for idx in range(len(emails)))
+    query = f"query({variables}) {{ {searches} }}"
+
+    headers = {
+        "Authorization": f"Bearer {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.graphql+json"
+    }
+    payload = {
+        "query": query,
+        "variables": {f"q{idx}": f"{email} in:email" for idx, email in enumerate(emails)}
+    }
+
+    response = get_http().post(f"{BASE_URL}/graphql", json=payload, headers=headers)
+
+    if response.status_code == 200 and response.json().get('data'):
+        data = response.json()['data']
+        logins = {}
+        for idx, email in enumerate(emails):
+            nodes = (data.get(f"e{idx}") or {}).get('nodes') or []
+            logins[email] = nodes[0].get('login') if nodes else None
+        return logins
+    else:
+        print(f"Error resolving emails: {response.status_code} {response.text}")
+        return None
+
+def resolve_logins(emails, batch_size=20):
+    """Bulk email -> login resolution, cache first, then batched searches for the rest."""
+    emails = list(dict.fromkeys(email.lower() for email in emails))
+    logins = get_cached_logins(emails)
+
+    missing = [email for email in emails if email not in logins]
+    for idx in range(0, len(missing), batch_size):
+        batch = missing[idx:idx + batch_size]
+        found = search_logins(batch)
+
+        # Errors are not cached -- retried on the next call
+        if found is None:
+            continue
+
+        for email, login in found.items():
+            cache_login(email, login)
+        logins.update(found)
+
+    return logins
+
 def get_login_name(username):
 
-    if '@' in username and '.' in username:
-        url = f"https://api.github.com/search/users?q={username}"
-        response = requests.get(url, headers=HEADERS)  
+    if is_email(username):
+        cached = get_cached_logins([username])
+        if username.lower() in cached:
+            return cached[username.lower()]
+
+        url = f"{BASE_URL}/search/users?q={username}"
+        response = get_http().get(url, headers=HEADERS)  
 
         if response.status_code == 200:
             search_results = response.json()
             if search_results['total_count'] > 0:
-                return search_results['items'][0]['login']
+                login = search_results['items'][0]['login']
             else:
-                return None
+                login = None
+
+            cache_login(username, login)
+            return login
         else:
             print(f"Error fetching user by email: {response.status_code} {response.text}")
             return None  # Handle error response appropriately
@@ -70,7 +276,7 @@ def get_login_name(username):
 
 def get_user_info(username):
     url = f"{BASE_URL}/users/{username}"
-    response = requests.get(url, headers=HEADERS)
+    response = get_http().get(url, headers=HEADERS)
 
     if response.status_code == 200:
         return response.json()
@@ -78,25 +284,18 @@ def get_user_info(username):
         print(f"Error fetching user info: {response.status_code} {response.text}")
         return {}
 
-def get_user_contributions(username):
-    # GraphQL query
-    query = '''
-    query($userName: String!) { 
-      user(login: $userName) {
-        contributionsCollection {
-          contributionCalendar {
-            totalContributions
-            weeks {
-              contributionDays {
-                contributionCount
-                date
-              }
-            }
-          }
-        }
-      }
-    }
-    '''
+def fetch_contribution_calendars(logins, start, end):
+    """Contribution days of several users in one GraphQL call -- {login: {date: count}}, None on error.
+
+    GitHub allows at most one year between <start> and <end>.
+    """
+    users = "\n".join(
+        f'u{idx}: user(login: $l{idx}) {{ contributionsCollection(from: $from, to: $to) {{ '
+        f'contributionCalendar {{ weeks {{ contributionDays {{ contributionCount date }} }} }} }} }}'
+        for idx in range(len(logins))
+    )
+    variables = ", ".join(f"$l{idx}: String!" for idx in range(len(logins)))
+    query = f"query($from: DateTime!, $to: DateTime!, {variables}) {{ {users} }}"
 
     # Set up the request headers and payload
     headers = {
@@ -105,41 +304,247 @@ def get_user_contributions(username):
     }
     payload = {
         "query": query,
-        "variables": {"userName": username}
+        "variables": {
+            "from": f"{start.isoformat()}T00:00:00Z",
+            "to": f"{end.isoformat()}T23:59:59Z",
+            **{f"l{idx}": login for idx, login in enumerate(logins)}
+        }
     }
 
     # Make the request
-    response = requests.post('https://api.github.com/graphql', json=payload, headers=headers)
+    response = get_http().post(f"{BASE_URL}/graphql", json=payload, headers=headers)
 
-    if response.status_code == 200:
-        contributions = response.json()
+    if response.status_code == 200 and response.json().get('data'):
+        data = response.json()['data']
+        calendars = {}
 
-        total_contributions = contributions['data']['user']['contributionsCollection']['contributionCalendar']['totalContributions']
-        weeks = contributions['data']['user']['contributionsCollection']['contributionCalendar']['weeks']
+        for idx, login in enumerate(logins):
+            # Unknown users come back as null
+            if not data.get(f"u{idx}"):
+                continue
 
-        data = {
-            "total": total_contributions,
-            "weeks":weeks
-        }
+            weeks = data[f"u{idx}"]['contributionsCollection']['contributionCalendar']['weeks']
+            calendars[login] = {day['date']: day['contributionCount'] for week in weeks for day in week['contributionDays']}
 
-        return data
+        return calendars
     else:
         print(f"Error fetching contributions: {response.status_code} {response.text}")
         return None
 
-def get_user_repositories(username):
-    url = f"{BASE_URL}/users/{username}/repos"
-    response = requests.get(url, headers=HEADERS)
+def refresh_contribution_days(logins, start, end, batch_size=10):
+    """Fetch and store the calendar days of <logins> between start and end."""
+    refreshed = {}
+    fetched_at = datetime.utcnow()
+
+    # One GraphQL call covers a batch of users over at most one year
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + timedelta(days=364))
+
+        for idx in range(0, len(logins), batch_size):
+            calendars = fetch_contribution_calendars(logins[idx:idx + batch_size], chunk_start, chunk_end)
+            if not calendars:
+                continue
+
+            operations = []
+            for login, days in calendars.items():
+                refreshed.setdefault(login, {}).update(days)
+                operations += [UpdateOne(
+                    {'login': login, 'date': day},
+                    {'$set': {'count': count, 'fetched_at': fetched_at}},
+                    upsert=True
+                ) for day, count in days.items()]
+
+            if operations:
+                contribution_days.bulk_write(operations, ordered=False)
+
+        chunk_start = chunk_end + timedelta(days=1)
+
+    return refreshed
+
+def get_contribution_days(logins, start, end):
+    """{login: {date: count}} between start and end -- GitHub is only called for missing or stale days."""
+    ensure_indexes()
+
+    now = datetime.utcnow()
+    end = min(end, now.date())
+
+    # Past days are final, only the last two can still change
+    recent = (now.date() - timedelta(days=1)).isoformat()
+    stale_before = now - timedelta(hours=CONTRIBUTIONS_TTL)
+
+    stored = {login: {} for login in logins}
+    stale = {login: set() for login in logins}
+
+    cursor = contribution_days.find({
+        'login': {'$in': logins},
+        'date': {'$gte': start.isoformat(), '$lte': end.isoformat()}
+    })
+    for doc in cursor:
+        stored[doc['login']][doc['date']] = doc['count']
+        if doc['date'] >= recent and doc['fetched_at'] < stale_before:
+            stale[doc['login']].add(doc['date'])
+
+    expected = [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+
+    # Users needing the same range are fetched together
+    ranges = {}
+    for login in logins:
+        missing = [day for day in expected if day not in stored[login] or day in stale[login]]
+        if missing:
+            ranges.setdefault((missing[0], missing[-1]), []).append(login)
+
+    for (first, last), group in ranges.items():
+        print(f"Refreshing Contributions {first} -> {last} for {len(group)} users")
+        refreshed = refresh_contribution_days(group, datetime.strptime(first, "%Y-%m-%d").date(), datetime.strptime(last, "%Y-%m-%d").date())
+
+        for login, days in refreshed.items():
+            stored[login].update({day: count for day, count in days.items() if start.isoformat() <= day <= end.isoformat()})
+
+    return stored
+
+def get_contribution_range(args):
+    """(start, end) dates from ?from=YYYY-MM-DD&to=YYYY-MM-DD, one year back from today by default."""
+    end = datetime.strptime(args['to'], "%Y-%m-%d").date() if args.get('to') else datetime.utcnow().date()
+    start = datetime.strptime(args['from'], "%Y-%m-%d").date() if args.get('from') else end - timedelta(days=365)
+
+    if start > end:
+        raise ValueError("'from' is after 'to'")
+
+    return start, end
+
+def get_user_contributions(username, start=None, end=None):
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=365)
+
+    days = get_contribution_days([username], start, end)[username]
+    if not days:
+        return None
+
+    # Same shape as GitHub's contributionCalendar -- weeks start on Sunday
+    weeks = []
+    for day, count in sorted(days.items()):
+        if not weeks or datetime.strptime(day, "%Y-%m-%d").weekday() == 6:
+            weeks.append({"contributionDays": []})
+        weeks[-1]["contributionDays"].append({"contributionCount": count, "date": day})
+
+    data = {
+        "total": sum(days.values()),
+        "weeks":weeks
+    }
+
+    return data
+
+def get_repository(owner, repo):
+    """Single repo lookup -- forks include their 'parent'."""
+    url = f"{BASE_URL}/repos/{owner}/{repo}"
+    response = get_http().get(url, headers=HEADERS)
 
     if response.status_code == 200:
         return response.json()
     else:
+        print(f"Error fetching repository {owner}/{repo}: {response.status_code} {response.text}")
+        return None
+
+def summarize_repository(repo):
+    return {
+        "name": repo["name"],
+        "full_name": repo["full_name"],
+        "description": repo["description"],
+        "fork": repo["fork"],
+        "archived": repo.get("archived", False),
+        "language": repo["language"],
+        "topics": repo.get("topics", []),
+        "stars": repo["stargazers_count"],
+        "forks_count": repo["forks_count"],
+        "created_at": repo["created_at"],
+        "updated_at": repo["updated_at"],
+        "pushed_at": repo["pushed_at"],
+    }
+
+def fetch_user_repositories(username):
+    """All pages of a user's repos -- the first page tells how many pages to fetch concurrently."""
+    url = f"{BASE_URL}/users/{username}/repos"
+    params = {'per_page': 100, 'page': 1}
+
+    response = get_http().get(url, headers=HEADERS, params=params)
+    if response.status_code != 200:
         print(f"Error fetching repositories: {response.status_code} {response.text}")
+        return None
+
+    repos = response.json()
+
+    last_url = response.links.get('last', {}).get('url')
+    if last_url:
+        last_page = int(parse_qs(urlparse(last_url).query)['page'][0])
+
+        def fetch_page(page):
+            page_response = get_http().get(url, headers=HEADERS, params={**params, 'page': page})
+            if page_response.status_code == 200:
+                return page_response.json()
+            print(f"Error fetching repositories page {page}: {page_response.status_code} {page_response.text}")
+            return None
+
+        with ThreadPoolExecutor(max_workers=REPO_LIST_WORKERS) as executor:
+            pages = list(executor.map(fetch_page, range(2, last_page + 1)))
+
+        # Don't cache a partial listing
+        if any(page is None for page in pages):
+            return None
+
+        for page in pages:
+            repos.extend(page)
+
+    return [summarize_repository(repo) for repo in repos]
+
+def get_user_repositories(username):
+    ensure_indexes()
+
+    cached = repo_lists.find_one({'_id': username, 'expires_at': {'$gt': datetime.utcnow()}})
+    if cached:
+        return cached['repos']
+
+    repos = fetch_user_repositories(username)
+    if repos is None:
         return []
 
+    repo_lists.update_one(
+        {'_id': username},
+        {'$set': {'repos': repos, 'expires_at': datetime.utcnow() + timedelta(minutes=REPO_LIST_TTL)}},
+        upsert=True
+    )
+    return repos
+
+def filter_repositories(repos, args):
+    """Apply the query string filters / sorting of the repos route."""
+    if args.get('q'):
+        repos = [repo for repo in repos if args['q'].lower() in repo['name'].lower()]
+    if args.get('language'):
+        repos = [repo for repo in repos if (repo['language'] or '').lower() == args['language'].lower()]
+    if args.get('topic'):
+        repos = [repo for repo in repos if args['topic'] in repo['topics']]
+    for flag in ('fork', 'archived'):
+        if args.get(flag) in ('true', 'false'):
+            repos = [repo for repo in repos if repo[flag] == (args[flag] == 'true')]
+
+    sort_keys = {
+        'name': lambda repo: repo['name'].lower(),
+        'stars': lambda repo: repo['stars'],
+        'created': lambda repo: repo['created_at'],
+        'updated': lambda repo: repo['updated_at'],
+        'pushed': lambda repo: repo['pushed_at'] or '',
+    }
+    if args.get('sort') in sort_keys:
+        repos = sorted(repos, key=sort_keys[args['sort']], reverse=args.get('direction', 'asc') == 'desc')
+
+    if args.get('limit', '').isdigit():
+        repos = repos[:int(args['limit'])]
+
+    return repos
+
 def get_repo_topics(repo_full_name):
     url = f"{BASE_URL}/repos/{repo_full_name}/topics"
-    response = requests.get(url, headers=HEADERS)
+    response = get_http().get(url, headers=HEADERS)
     
     if response.status_code == 200:
         return response.json().get('names', [])
@@ -147,29 +552,73 @@ def get_repo_topics(repo_full_name):
         print(f"Error fetching topics: {response.status_code} {response.text}")
         return []
 
+def store_commit_files(repo_full_name, sha, message, files):
+    """Keep the full message and file stats of a commit out of repo_details -- columnar and zlib compressed."""
+    blob = {
+        "message": message,
+        "filename": [file['filename'] for file in files],
+        "additions": [file['additions'] for file in files],
+        "deletions": [file['deletions'] for file in files],
+    }
+
+    commit_files.update_one(
+        {'_id': f"{repo_full_name}@{sha}"},
+        {'$set': {'data': zlib.compress(json.dumps(blob).encode(), 6)}},
+        upsert=True
+    )
+
+def load_commit_files(repo_full_name, sha):
+    doc = commit_files.find_one({'_id': f"{repo_full_name}@{sha}"})
+    if not doc:
+        return None
+
+    blob = json.loads(zlib.decompress(doc['data']))
+
+    return {
+        "sha": sha,
+        "message": blob["message"],
+        "files": [{"filename": filename, "additions": additions, "deletions": deletions}
+                    for filename, additions, deletions in zip(blob["filename"], blob["additions"], blob["deletions"])]
+    }
+
 def get_commit_details_from_SHA(repo_full_name, sha):
 
     url = f"{BASE_URL}/repos/{repo_full_name}/commits/{sha}"
-    response = requests.get(url, headers=HEADERS)
+    response = get_http().get(url, headers=HEADERS)
 
     if response.status_code == 200:
         commit_data = response.json()
 
+        # Commit authors seed the email -> login cache for free
+        if commit_data.get("author") and commit_data["commit"]["author"].get("email"):
+            cache_login(commit_data["commit"]["author"]["email"], commit_data["author"]["login"])
+
+        # Files and the full message are served on demand -- see get_commit_files
+        store_commit_files(repo_full_name, commit_data["sha"], commit_data["commit"]["message"], commit_data['files'])
+
         return {
             "sha": commit_data["sha"],
-            "message": commit_data["commit"]["message"],
+            "message": commit_data["commit"]["message"].split("\n", 1)[0],
             "date": commit_data["commit"]["committer"]["date"],
             "url": commit_data["html_url"],
             "author": commit_data["commit"]["author"]["name"],
             "stats": commit_data["stats"],
-            "files": [{"filename": file['filename'], "additions": file['additions'], "deletions": file['deletions']}
-                        for file in commit_data['files']]
+            "changed_files": len(commit_data['files'])
         }
     else:
         print(f"Error fetching commit details for {sha}: {response.status_code} {response.text}")
         return None
 
-def get_user_global_commits(repo_full_name, username, start_date):
+def get_commit_files(repo_full_name, sha):
+    """Full message and file list of a commit, fetched from GitHub if it was never ingested."""
+    files = load_commit_files(repo_full_name, sha)
+
+    if files is None and get_commit_details_from_SHA(repo_full_name, sha):
+        files = load_commit_files(repo_full_name, sha)
+
+    return files
+
+def get_user_global_commits(repo_full_name, username, start_date, end_date=None):
 
     #testing
     # return []
@@ -178,7 +627,7 @@ def get_user_global_commits(repo_full_name, username, start_date):
     
     # Step 1: Get all branches
     branches_url = f"{BASE_URL}/repos/{repo_full_name}/branches"
-    branches_response = requests.get(branches_url, headers=HEADERS)
+    branches_response = get_http().get(branches_url, headers=HEADERS)
 
     if branches_response.status_code == 200:
         branches = branches_response.json()
@@ -190,7 +639,9 @@ def get_user_global_commits(repo_full_name, username, start_date):
             while True:
                 # Fetch commits authored by the specified user for each branch
                 url = f"{BASE_URL}/repos/{repo_full_name}/commits?author={username}&sha={branch_name}&per_page=100&page={page}&since={start_date}"
-                response = requests.get(url, headers=HEADERS)
+                if end_date:
+                    url += f"&until={to_github_timestamp(end_date)}"
+                response = get_http().get(url, headers=HEADERS)
 
                 if response.status_code == 200:
                     branch_commits = response.json()
@@ -217,7 +668,106 @@ def get_user_global_commits(repo_full_name, username, start_date):
     # Reversing for Old -> New order
     return commits_with_details[::-1]
 
-def get_user_issues(repo_full_name, username, start_date):
+def get_user_global_commits_lite(repo_full_name, author_id, start_date, end_date=None):
+    """Commit stats of a user on every branch from GraphQL history -- 100 commits per call instead of one call per commit.
+
+    File lists are left out and fetched on demand (see get_commit_files). A page that hits GraphQL resource
+    limits is retried smaller; errors raise GitHubUnavailable rather than storing a truncated history.
+    """
+    query = '''
+    query($owner: String!, $name: String!, $branch: String!, $since: GitTimestamp!, $until: GitTimestamp, $authorId: ID!, $cursor: String, $first: Int!) {
+      repository(owner: $owner, name: $name) {
+        ref(qualifiedName: $branch) {
+          target {
+            ... on Commit {
+              history(first: $first, after: $cursor, since: $since, until: $until, author: {id: $authorId}) {
+                pageInfo { hasNextPage endCursor }
+                nodes {
+                  oid
+                  messageHeadline
+                  committedDate
+                  url
+                  additions
+                  deletions
+                  changedFilesIfAvailable
+                  author { name }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+    '''
+
+    headers = {
+        "Authorization": f"Bearer {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github.graphql+json"
+    }
+    owner, name = repo_full_name.split('/')
+    commits_with_details = []
+
+    branches_url = f"{BASE_URL}/repos/{repo_full_name}/branches"
+    branches = [branch for page_data in iter_paginated(branches_url) for branch in page_data]
+
+    for branch in branches:
+        branch_name = branch['name']
+        cursor = None
+        page_size = 100
+
+        while True:
+            payload = {
+                "query": query,
+                "variables": {"owner": owner, "name": name, "branch": f"refs/heads/{branch_name}",
+                              "since": to_github_timestamp(start_date),
+                              "until": to_github_timestamp(end_date) if end_date else None, "authorId": author_id,
+                              "cursor": cursor, "first": page_size}
+            }
+            response = get_http().post(f"{BASE_URL}/graphql", json=payload, headers=headers)
+
+            if response.status_code != 200:
+                raise GitHubUnavailable(f"Commit history of {repo_full_name}@{branch_name} failed -- {response.status_code} {response.text}")
+
+            body = response.json()
+            if body.get('errors'):
+                rate_limited = any(error.get('type') == 'RATE_LIMITED' for error in body['errors'])
+
+                # Stats of 100 commits can exceed the query limits -- same page, smaller
+                if not rate_limited and page_size > 10:
+                    page_size //= 2
+                    print(f"Retrying commit history of {branch_name} with {page_size} per page -- {body['errors']}")
+                    continue
+
+                raise GitHubUnavailable(f"Commit history of {repo_full_name}@{branch_name} failed -- {body['errors']}")
+
+            # Deleted since the branches were listed
+            ref = ((body.get('data') or {}).get('repository') or {}).get('ref')
+            if not ref:
+                print(f"Branch {branch_name} not found -- skipped")
+                break
+
+            history = ref['target']['history']
+            for commit in history['nodes']:
+                commits_with_details.append({
+                    "sha": commit["oid"],
+                    "message": commit["messageHeadline"],
+                    "date": commit["committedDate"],
+                    "url": commit["url"],
+                    "author": commit["author"]["name"],
+                    "stats": {"additions": commit["additions"], "deletions": commit["deletions"],
+                              "total": commit["additions"] + commit["deletions"]},
+                    "changed_files": commit["changedFilesIfAvailable"],
+                    "branch": branch_name
+                })
+
+            if not history['pageInfo']['hasNextPage']:
+                break
+            cursor = history['pageInfo']['endCursor']
+
+    # Reversing for Old -> New order
+    return commits_with_details[::-1]
+
+def get_user_issues(repo_full_name, username, start_date, end_date=None):
     #testing
     # return []
 
@@ -226,7 +776,7 @@ def get_user_issues(repo_full_name, username, start_date):
     page = 1
     while True:
         url = f"{BASE_URL}/repos/{repo_full_name}/issues?page={page}&per_page=100&state=all&since={start_date}"
-        response = requests.get(url, headers=HEADERS)
+        response = get_http().get(url, headers=HEADERS)
 
         if response.status_code == 200:
             issues = response.json()
@@ -237,6 +787,8 @@ def get_user_issues(repo_full_name, username, start_date):
                 # Check if this is a pull request
                 if 'pull_request' in issue:
                     pass
+                elif end_date and issue['created_at'] >= to_github_timestamp(end_date):
+                    pass
                 elif (issue['user']['login'] == username) or any(assignee['login'] == username for assignee in issue['assignees']):
                     print(f"Getting | Issue -> {issue['number']}")
                     
@@ -268,7 +820,7 @@ def get_issue_comments(issue_list, username):
         
         while True:
             url = f"{BASE_URL}/repos/{repo_full_name}/issues/{issue['number']}/comments?page={page}&per_page=100"
-            response = requests.get(url, headers=HEADERS)
+            response = get_http().get(url, headers=HEADERS)
 
             if response.status_code == 200:
                 issue_comments = response.json()
@@ -295,12 +847,13 @@ def get_issue_comments(issue_list, username):
     return comments
 
 # -- GROUP
-def get_pr_details_commits_comments(repo_full_name, username, start_date):
+def get_pr_details_commits_comments(repo_full_name, username, start_date, end_date=None):
 
     base_url = f"{BASE_URL}/repos/{repo_full_name}"
     pull_details_list = []
     page = 1
     per_page = 100  # Adjust the number of results per page if necessary
+    review_cache = {}  # PR number -> reviews
 
     def get_paginated_data(url):
         """Fetch paginated data from a given URL."""
@@ -310,7 +863,7 @@ def get_pr_details_commits_comments(repo_full_name, username, start_date):
 
         while True:
             paginated_url = f"{url}?per_page={per_page}&page={page}"
-            response = requests.get(paginated_url, headers=HEADERS)
+            response = get_http().get(paginated_url, headers=HEADERS)
             
             if response.status_code != 200:
                 print(f"Error fetching data from {paginated_url}: {response.json()}")
@@ -342,12 +895,19 @@ def get_pr_details_commits_comments(repo_full_name, username, start_date):
         
         return detailed_commits
 
+    def get_reviews(pr_number):
+        """Reviews of a PR, fetched at most once per ingestion run."""
+        if pr_number not in review_cache:
+            review_cache[pr_number] = get_pr_reviews(repo_full_name, pr_number)
+
+        return review_cache[pr_number]
+
     def get_pr_comments(pr_number, username):
 
         comments_data = []
 
         review_url = f"{BASE_URL}/repos/{repo_full_name}/pulls/{pr_number}/reviews"
-        reviews = get_paginated_data(review_url)
+        reviews = get_reviews(pr_number)
 
         for review in reviews:
             if review['user']['login'] == username:
@@ -386,7 +946,7 @@ def get_pr_details_commits_comments(repo_full_name, username, start_date):
     while True:
         # Step 1: Get all pull requests with pagination
         pulls_url = f"{base_url}/pulls?state=all&per_page={per_page}&page={page}"
-        response = requests.get(pulls_url, headers=HEADERS)
+        response = get_http().get(pulls_url, headers=HEADERS)
         
         if response.status_code != 200:
             print(f"Error fetching pull requests: {response.json()}")
@@ -400,27 +960,30 @@ def get_pr_details_commits_comments(repo_full_name, username, start_date):
 
         # Step 2: Process each pull request
         for pr in pull_requests:
+            pr_date = datetime.strptime(pr['created_at'], "%Y-%m-%dT%H:%M:%SZ")
+
+            # Check Date boundary -- before any per-PR call
+            if pr_date<start_date:
+                return pull_details_list
+
+            # Newer than the requested range
+            if end_date and pr_date>=end_date:
+                continue
+
             pr_author = pr['user']['login']
             assigned_by = pr['assignee']['login'] if pr.get('assignee') else None
             assigned_to = [user['login'] for user in pr.get('assignees', [])]
-            pr_date = datetime.strptime(pr['created_at'], "%Y-%m-%dT%H:%M:%SZ")
-
             requested_reviewers = [reviewer['login'] for reviewer in pr.get('requested_reviewers', [])]
 
-            #To HANDLE - If someone approves review, they are removed from requested_reviewers
-            try:
-                review_url = f"{base_url}/pulls/{pr['number']}/reviews?per_page={per_page}"
-                response = requests.get(review_url, headers=HEADERS).json()
-                requested_reviewers += list(set(user['user']['login'] for user in response))
-            except:
-                pass
+            # Check if the author, assignees or requested reviewers match the username -- no extra calls
+            is_participant = pr_author == username or (username in requested_reviewers) or (username in assigned_to) or username==assigned_by
 
-            # Check Date boundary
-            if pr_date<start_date:
-                return pull_details_list
+            # Only undecided PRs need their reviews
+            # (If someone approves review, they are removed from requested_reviewers)
+            if not is_participant:
+                is_participant = any(get_login(review.get('user')) == username for review in get_reviews(pr['number']))
 
-            # Check if the author or requested reviewers match the username
-            if pr_author == username or (username in requested_reviewers) or (username in assigned_to) or username==assigned_by:
+            if is_participant:
                 pr_number = pr['number']
                 
                 # Get pull request details
@@ -453,7 +1016,7 @@ def get_pr_details_commits_comments(repo_full_name, username, start_date):
 def get_pr_details(repo_full_name, pr_number):
 
         url = f"{BASE_URL}/repos/{repo_full_name}/pulls/{pr_number}"
-        response = requests.get(url, headers=HEADERS)
+        response = get_http().get(url, headers=HEADERS)
         
         if response.status_code == 200:
             data = response.json()
@@ -483,151 +1046,423 @@ def get_pr_details(repo_full_name, pr_number):
             return None
 # --
 
+# REPO INDEX FUNCTIONS ------------------------------>
+# A repo's PRs, reviews, issues and comments are scanned once and indexed by participant login.
+# Every user's view of the repo is then read from the index instead of re-scanning GitHub.
+
+_indexes_ready = False
+
+def ensure_indexes():
+    global _indexes_ready
+
+    if not _indexes_ready:
+        repo_index.create_index([('repo', 1), ('kind', 1), ('participants', 1)])
+        repo_index.create_index([('repo', 1), ('kind', 1), ('number', 1)])
+        repo_index.create_index([('repo', 1), ('kind', 1), ('id', 1)])
+        repo_scans.create_index('repo', unique=True)
+        webhook_repos.create_index('repo', unique=True)
+        login_cache.create_index('expires_at', expireAfterSeconds=0)
+        repo_lists.create_index('expires_at', expireAfterSeconds=0)
+        contribution_days.create_index([('login', 1), ('date', 1)], unique=True)
+        change_log.create_index([('key', 1), ('version', 1)], unique=True)
+        webhook_deliveries.create_index('received_at', expireAfterSeconds=7 * 24 * 3600)
+        webhook_deliveries.create_index([('status', 1), ('retry_at', 1), ('received_at', 1)])
+        _indexes_ready = True
+
+def iter_paginated(url, params=None):
+    """Yield every page of a paginated GitHub listing.
+
+    Transient failures are retried on the same page by the shared session, so a listing resumes where it failed
+    instead of restarting -- or raises GitHubUnavailable rather than ending early with a partial result.
+    """
+    params = dict(params or {})
+    params.setdefault('per_page', 100)
+    page = 1
 
-# UPDATE FUNCTIONS ------------------------------>
+    while True:
+        params['page'] = page
+        response = get_http().get(url, headers=HEADERS, params=params)
 
-def update_repo_details(username, repo_details, start_date):
+        if response.status_code != 200:
+            print(f"Error fetching data from {url}: {response.status_code} {response.text}")
+            break
 
-    page = 1
-    checkpoint_reached = False  # Last Saved Snapshot
-    valid_date = True           # Window till start_date
-    latest_snapshot_id = None   # Initialize latest_snapshot_id to track the latest event ID
+        page_data = response.json()
+        if not page_data:  # No more data
+            break
 
-    new_updates = {
-        'commits': [],
-        'new_issues': [],
-        'new_prs': []
-    }
+        yield page_data
+        page += 1
 
-    while (not checkpoint_reached) and valid_date:
-        event_url = f"{BASE_URL}/users/{username}/events?per_page=100&page={page}"
-        response = requests.get(event_url, headers=HEADERS)
-        
-        if response.status_code == 200:
-            data = response.json()
+def get_pr_reviews(repo_full_name, pr_number):
+    reviews = []
+    for page_data in iter_paginated(f"{BASE_URL}/repos/{repo_full_name}/pulls/{pr_number}/reviews"):
+        reviews.extend(page_data)
 
-            # If no more events are returned, break the loop
-            if not data:
-                break
+    return reviews
 
-            # Check Valid Events
-            for event in data:
-                if page!=1:    # Perform below code only once 
-                    break
+def get_login(user):
+    # Deleted accounts come back as null users
+    return user['login'] if user else None
 
-                if (event['type'] in github_events) and (repo_details['name'] in event['repo']['name']):
-                    
-                    # No new data
-                    if repo_details['snapshot'] == event['id']:
-                        print("Repo is Up to Date")
-                        return repo_details
-                    else:
-                        # Set new snapshot
-                        latest_snapshot_id = event['id']
-                        break
+def scan_pull_requests(repo_full_name, since):
+    operations = []
+    url = f"{BASE_URL}/repos/{repo_full_name}/pulls"
+    params = {'state': 'all', 'sort': 'updated', 'direction': 'desc'}
 
-            # Update Data -------------------
-            print("Updating Data -->")
+    up_to_date = False
 
-            for event in data:
-                event_date = datetime.strptime(event['created_at'], "%Y-%m-%dT%H:%M:%SZ")
+    for pull_requests in iter_paginated(url, params):
+        for pr in pull_requests:
+            # Sorted by last update -- everything after this was already indexed
+            if pr['updated_at'] < since:
+                up_to_date = True
+                break
 
-                # Invalid Event
-                if (event['type'] not in github_events) or (repo_details['name'] not in event['repo']['name']):
-                    print("Invalid -- ", event['type'])
-                    continue
-                
-                # Update till we reach Snapshot
-                if repo_details['snapshot'] == event['id']:
-                    print("Checkpoint Reached <->", event['id'])
-                    checkpoint_reached = True
-                    break
-                
-                # Don't go beyond start date limit
-                if event_date<start_date:
-                    valid_date = False
-                    break
+            print(f"Indexing | PR -> {pr['number']}")
+            reviews = [{
+                'id': review['id'],
+                'user': get_login(review.get('user')),
+                'state': review['state'],
+                'body': review['body'],
+                'html_url': review['html_url'],
+                'submitted_at': review.get('submitted_at'),
+            } for review in get_pr_reviews(repo_full_name, pr['number'])]
+
+            participants = {get_login(pr['user']), get_login(pr.get('assignee'))}
+            participants.update(get_login(user) for user in pr.get('assignees', []))
+            participants.update(get_login(user) for user in pr.get('requested_reviewers', []))
+            participants.update(review['user'] for review in reviews)
+            participants.discard(None)
+
+            operations.append(UpdateOne(
+                {'repo': repo_full_name, 'kind': 'pull', 'number': pr['number']},
+                {'$set': {
+                    'created_at': pr['created_at'],
+                    'updated_at': pr['updated_at'],
+                    'participants': sorted(participants),
+                    'reviews': reviews,
+                    # Filled lazily by the first view that needs them
+                    'pr_details': None,
+                    'commits': None,
+                }},
+                upsert=True
+            ))
 
-                match event['type']:
-                    case 'IssuesEvent':
-                        new, (issue_no, data) = handle_issue_event(event, username)
-                        print(f"issue Update -- {issue_no}")
+        if up_to_date:
+            break
 
-                        if new:
-                            new_updates['new_issues'] += [data]
+    if operations:
+        repo_index.bulk_write(operations, ordered=False)
+
+def scan_issues(repo_full_name, since):
+    operations = []
+    url = f"{BASE_URL}/repos/{repo_full_name}/issues"
+
+    for issues in iter_paginated(url, {'state': 'all', 'since': since}):
+        for issue in issues:
+            # Pull requests are indexed separately
+            if 'pull_request' in issue:
+                continue
+
+            author = get_login(issue['user'])
+            assignees = [get_login(assignee) for assignee in issue['assignees']]
+
+            operations.append(UpdateOne(
+                {'repo': repo_full_name, 'kind': 'issue', 'number': issue['number']},
+                {'$set': {
+                    'created_at': issue['created_at'],
+                    'updated_at': issue['updated_at'],
+                    'participants': sorted({author, *assignees} - {None}),
+                    'issue': {
+                        'title': issue['title'],
+                        'number': issue['number'],
+                        'created_at': issue['created_at'],
+                        'updated_at': issue['updated_at'],
+                        'labels': issue['labels'],
+                        'state': issue['state'],
+                        'author': author
+                    }
+                }},
+                upsert=True
+            ))
+
+    if operations:
+        repo_index.bulk_write(operations, ordered=False)
+
+def scan_comments(repo_full_name, since):
+    operations = []
+
+    # Repo wide listing -- one paginated call instead of one per review
+    listings = (
+        ('review_comment', f"{BASE_URL}/repos/{repo_full_name}/pulls/comments", 'pull_request_url'),
+    )
+
+    for kind, url, parent_url in listings:
+        for comments in iter_paginated(url, {'since': since}):
+            for comment in comments:
+                login = get_login(comment['user'])
+
+                operations.append(UpdateOne(
+                    {'repo': repo_full_name, 'kind': kind, 'id': comment['id']},
+                    {'$set': {
+                        'number': int(comment[parent_url].rsplit('/', 1)[-1]),
+                        'review_id': comment.get('pull_request_review_id'),
+                        'participants': [login] if login else [],
+                        'comment': {
+                            'id': comment['id'],
+                            'body': comment['body'],
+                            'user': login,
+                            'created_at': comment['created_at'],
+                            'updated_at': comment['updated_at'],
+                            'html_url': comment['html_url'],
+                            'path': comment.get('path')
+                        }
+                    }},
+                    upsert=True
+                ))
 
-                        else:
-                            # Assign the latest data
-                            if issue_no and issue_no not in new_updates:
-                                new_updates[issue_no] = data
+    if operations:
+        repo_index.bulk_write(operations, ordered=False)
 
-                    case 'PullRequestEvent':
-                        new, data = handle_pull_request_event(event, repo_details, username)
+def scan_repository(repo_full_name, start_date):
+    """Incrementally bring the shared index of a repo up to date."""
+    ensure_indexes()
 
-                        if new:
-                            new_updates['new_prs'] += [data]
-                        
-                        else:
-                            pr_no, data = data
+    scan = repo_scans.find_one({'repo': repo_full_name}) or {}
+    scan_started = datetime.utcnow()
 
-                            if pr_no not in new_updates:
-                                new_updates[pr_no] = {'pr_details': None, 'commits': [], 'comments': []}
+    window_start = to_github_timestamp(start_date)
+    covered = scan.get('cursor') and scan.get('window_start', window_start) <= window_start
 
-                            new_updates[pr_no]['pr_details'] = data
+    # Skip if another user of this repo triggered a scan moments ago -- a wider window is always scanned
+    if covered and scan.get('scanned_at') and (scan_started - scan['scanned_at']).total_seconds() < REPO_SCAN_INTERVAL:
+        return
 
-                    case 'PullRequestReviewEvent':
-                        pr_no,comments = handle_pull_request_review_event(event, username)
-                        pr_details = get_pr_details(event['repo']['name'], event['payload']['pull_request']['number'])
+    # Continue from the last cursor, unless the requested window reaches further back than what is indexed
+    if covered:
+        since = scan['cursor']
+        window_start = scan['window_start']
+    else:
+        since = window_start
 
-                        if pr_no not in new_updates:
-                            new_updates[pr_no] = {'pr_details': None, 'commits': [], 'comments': []}
-                        
-                        new_updates[pr_no]['comments'] += comments
+    print(f"Scanning {repo_full_name} since {since}")
+    scan_pull_requests(repo_full_name, since)
+    scan_issues(repo_full_name, since)
+    scan_comments(repo_full_name, since)
 
-                        if pr_details:
-                            new_updates[pr_no]['pr_details'] = pr_details
+    # Anything updated while scanning is picked up by the next scan
+    repo_scans.update_one(
+        {'repo': repo_full_name},
+        {'$set': {'cursor': to_github_timestamp(scan_started), 'window_start': window_start, 'scanned_at': scan_started}},
+        upsert=True
+    )
 
-                    case 'PushEvent':
-                        commit_data, isGlobal = handle_push_event(event, repo_details)
+def get_indexed_pr_commits(repo_full_name, doc):
+    if doc['commits'] is None:
+        commits_url = f"{BASE_URL}/repos/{repo_full_name}/pulls/{doc['number']}/commits"
+        doc['commits'] = [{'sha': commit['sha'], 'author': get_login(commit['author'])}
+                            for commits in iter_paginated(commits_url) for commit in commits]
 
-                        if isGlobal:
-                            new_updates['commits'] += [commit_data]
-                            print("Global Commit")
-                        else:
-                            (pr_no, pr_commit) = commit_data
-                            if not pr_no:
-                                continue
-                            if pr_no not in new_updates:
-                                new_updates[pr_no] = {'pr_details': None, 'commits': [], 'comments': []}
+        repo_index.update_one({'_id': doc['_id']}, {'$set': {'commits': doc['commits']}})
 
-                            # This is to handle cases when forks are updated in PushEvent (not required)
-                            if pr_commit['author'] == username:
-                                new_updates[pr_no]['commits'] += [pr_commit]
-                                print("PR Commit", pr_no)
+    return doc['commits']
 
-                                pr_details = get_pr_details(repo_details['full_name'], pr_no)
-                                if pr_details:
-                                    new_updates[pr_no]['pr_details'] = pr_details
+def get_indexed_user_issues(repo_full_name, username, start_date, end_date=None):
+    issues_details = []
 
-                    case _:
-                        print(f"Unwanted Event -- {event['type']}")
+    query = {
+        'repo': repo_full_name,
+        'kind': 'issue',
+        'participants': username,
+        'updated_at': {'$gte': to_github_timestamp(start_date)}
+    }
+    if end_date:
+        query['created_at'] = {'$lt': to_github_timestamp(end_date)}
 
-            # Increment the page number for the next request
-            page += 1
+    cursor = repo_index.find(query).sort('created_at', -1)
 
-        else:
-            print(f"Failed to fetch events for {username}, Status Code: {response.status_code}")
-            return repo_details  # Exit if the request fails
+    for doc in cursor:
+        issue_data = dict(doc['issue'])
+        author = issue_data.pop('author')
+        issue_data['type'] = 'created' if author == username else 'assigned'
 
-    # If checkpoint not found -- 90 days gap  
-    if not checkpoint_reached:
-        return 'redirect'
+        issues_details.append(issue_data)
+
+    return issues_details
+
+def get_indexed_user_pull_requests(repo_full_name, username, start_date, end_date=None):
+    pull_details_list = []
+
+    # Review comments of the user, grouped by review
+    review_comments = {}
+    for doc in repo_index.find({'repo': repo_full_name, 'kind': 'review_comment', 'participants': username}):
+        review_comments.setdefault(doc['review_id'], []).append(doc['comment'])
+
+    created_at = {'$gte': to_github_timestamp(start_date)}
+    if end_date:
+        created_at['$lt'] = to_github_timestamp(end_date)
+
+    cursor = repo_index.find({
+        'repo': repo_full_name,
+        'kind': 'pull',
+        'participants': username,
+        'created_at': created_at
+    }).sort('created_at', -1)
+
+    for doc in cursor:
+        pr_number = doc['number']
+
+        pr_details = doc['pr_details']
+        if pr_details is None:
+            pr_details = get_pr_details(repo_full_name, pr_number)
+            if not pr_details:
+                continue
+            repo_index.update_one({'_id': doc['_id']}, {'$set': {'pr_details': pr_details}})
+
+        print(f"Getting --> {pr_number}")
+        filtered_commits = []
+        for commit in get_indexed_pr_commits(repo_full_name, doc):
+            if commit['author'] == username:
+                details = get_commit_details_from_SHA(repo_full_name, commit['sha'])
+                if details:
+                    filtered_commits.append(details)
+
+        filtered_comments = []
+        for review in doc['reviews']:
+            if review['user'] != username:
+                continue
+
+            if review['state'] == 'APPROVED' or review['body']:
+                filtered_comments.append({
+                    'state': "approved",
+                    'url': review['html_url'],
+                    'comment': review['body'] if review['body'] else None,
+                    'date': review['submitted_at'],
+                })
+
+            elif review['state'] in ('CHANGES_REQUESTED', 'COMMENTED'):
+                for comment in review_comments.get(review['id'], []):
+                    filtered_comments.append({
+                        'state': review['state'].lower(),
+                        'url': comment['html_url'],
+                        'comment': comment['body'],
+                        'date': comment['updated_at'],
+                        'file': comment['path']
+                    })
+
+        pull_details_list.append({
+            "pr_number": pr_number,
+            "pr_details": pr_details,
+            "commits": filtered_commits,
+            "comments": filtered_comments,
+        })
+
+    return pull_details_list
+
+def get_repo_user_view(repo_full_name, username, start_date, end_date=None):
+    """Issues and pull requests of one user, in the shape of get_user_issues / get_pr_details_commits_comments."""
+    scan_repository(repo_full_name, start_date)
+
+    issues = get_indexed_user_issues(repo_full_name, username, start_date, end_date)
+    pull_requests = get_indexed_user_pull_requests(repo_full_name, username, start_date, end_date)
+
+    return issues, pull_requests
+
+
+
+# UPDATE FUNCTIONS ------------------------------>
+
+def new_update_buffer():
+    return {
+        'commits': [],
+        'new_issues': [],
+        'new_prs': []
+    }
+
+def collect_event_update(event, repo_details, username, new_updates):
+    """Fold a single event into the pending <new_updates> of a repo."""
+
+    match event['type']:
+        case 'IssuesEvent':
+            new, (issue_no, data) = handle_issue_event(event, username)
+            print(f"issue Update -- {issue_no}")
+
+            if new:
+                new_updates['new_issues'] += [data]
+
+            else:
+                # Assign the latest data
+                if issue_no and issue_no not in new_updates:
+                    new_updates[issue_no] = data
+
+        case 'PullRequestEvent':
+            new, data = handle_pull_request_event(event, repo_details, username)
+
+            if new:
+                new_updates['new_prs'] += [data]
+            
+            else:
+                pr_no, data = data
+
+                if pr_no not in new_updates:
+                    new_updates[pr_no] = {'pr_details': None, 'commits': [], 'comments': []}
+
+                new_updates[pr_no]['pr_details'] = data
 
-    # ---> Update repo_details with the <new_updates> dict
+                # Webhook only -- commits pushed to the PR branch, e.g. on the user's fork the parent's hook doesn't see
+                if event['payload']['action'] == 'synchronize':
+                    new_updates[pr_no]['commits'] += get_new_pr_commits(repo_details, pr_no, username)
 
-    repo_details['commits'] += new_updates['commits']
-    repo_details['pull_requests'] += new_updates['new_prs']
-    repo_details['issues'] += new_updates['new_issues']
+        case 'PullRequestReviewEvent':
+            pr_no,comments = handle_pull_request_review_event(event, username)
+            pr_details = get_pr_details(event['repo']['name'], event['payload']['pull_request']['number'])
+
+            if pr_no not in new_updates:
+                new_updates[pr_no] = {'pr_details': None, 'commits': [], 'comments': []}
+            
+            new_updates[pr_no]['comments'] += comments
+
+            if pr_details:
+                new_updates[pr_no]['pr_details'] = pr_details
+
+        case 'PushEvent':
+            commit_data, isGlobal = handle_push_event(event, repo_details)
+
+            if isGlobal:
+                new_updates['commits'] += [commit_data]
+                print("Global Commit")
+            else:
+                (pr_no, pr_commit) = commit_data
+                if not pr_no:
+                    return
+                if pr_no not in new_updates:
+                    new_updates[pr_no] = {'pr_details': None, 'commits': [], 'comments': []}
+
+                # This is to handle cases when forks are updated in PushEvent (not required)
+                if pr_commit['author'] == username:
+                    new_updates[pr_no]['commits'] += [pr_commit]
+                    print("PR Commit", pr_no)
+
+                    pr_details = get_pr_details(repo_details['full_name'], pr_no)
+                    if pr_details:
+                        new_updates[pr_no]['pr_details'] = pr_details
+
+        case _:
+            print(f"Unwanted Event -- {event['type']}")
+
+def apply_updates(repo_details, new_updates):
+    """Merge the collected <new_updates> into repo_details.
+
+    Skips what is already stored -- events after a webhook delivery replay the same changes.
+    """
+    known_commits = {commit['sha'] for commit in repo_details['commits'] if commit}
+    known_prs = {pr['pr_number'] for pr in repo_details['pull_requests']}
+    known_issues = {issue['number'] for issue in repo_details['issues']}
+
+    repo_details['commits'] += [commit for commit in new_updates['commits'] if not commit or commit['sha'] not in known_commits]
+    repo_details['pull_requests'] += [pr for pr in new_updates['new_prs'] if pr['pr_number'] not in known_prs]
+    repo_details['issues'] += [issue for issue in new_updates['new_issues'] if issue['number'] not in known_issues]
 
     del new_updates['commits']
     del new_updates['new_prs']
@@ -649,15 +1484,90 @@ def update_repo_details(username, repo_details, start_date):
                 repo_details['pull_requests'][idx]['pr_details'] = pr_changes['pr_details']
             
             if pr_changes['commits']:
-                repo_details['pull_requests'][idx]['commits'] += pr_changes['commits']
+                known = {commit['sha'] for commit in pr['commits']}
+                pr['commits'] += [commit for commit in pr_changes['commits'] if commit['sha'] not in known]
             
             if pr_changes['comments']:
-                repo_details['pull_requests'][idx]['comments'] += pr_changes['comments']
+                known = {(comment['url'], comment['date']) for comment in pr['comments']}
+                pr['comments'] += [comment for comment in pr_changes['comments'] if (comment['url'], comment['date']) not in known]
 
+    return repo_details
 
-    repo_details['snapshot'] = latest_snapshot_id
+def collect_repo_updates(username, repo_details, start_date):
+    """Events since the stored snapshot as (new_updates, snapshot id) -- None if the events couldn't be fetched,
+    'redirect' if the snapshot fell out of the events window. Nothing is applied yet (see apply_updates).
+    """
 
-    return repo_details
+    page = 1
+    checkpoint_reached = False  # Last Saved Snapshot
+    valid_date = True           # Window till start_date
+    latest_snapshot_id = None   # Initialize latest_snapshot_id to track the latest event ID
+
+    new_updates = new_update_buffer()
+
+    while (not checkpoint_reached) and valid_date:
+        event_url = f"{BASE_URL}/users/{username}/events?per_page=100&page={page}"
+        response = get_http().get(event_url, headers=HEADERS)
+        
+        if response.status_code == 200:
+            data = response.json()
+
+            # If no more events are returned, break the loop
+            if not data:
+                break
+
+            # Check Valid Events
+            for event in data:
+                if page!=1:    # Perform below code only once 
+                    break
+
+                if (event['type'] in github_events) and (repo_details['name'] in event['repo']['name']):
+                    
+                    # No new data
+                    if repo_details['snapshot'] == event['id']:
+                        print("Repo is Up to Date")
+                        return new_updates, repo_details['snapshot']
+                    else:
+                        # Set new snapshot
+                        latest_snapshot_id = event['id']
+                        break
+
+            # Update Data -------------------
+            print("Updating Data -->")
+
+            for event in data:
+                event_date = datetime.strptime(event['created_at'], "%Y-%m-%dT%H:%M:%SZ")
+
+                # Invalid Event
+                if (event['type'] not in github_events) or (repo_details['name'] not in event['repo']['name']):
+                    print("Invalid -- ", event['type'])
+                    continue
+                
+                # Update till we reach Snapshot
+                if repo_details['snapshot'] == event['id']:
+                    print("Checkpoint Reached <->", event['id'])
+                    checkpoint_reached = True
+                    break
+                
+                # Don't go beyond start date limit
+                if event_date<start_date:
+                    valid_date = False
+                    break
+
+                collect_event_update(event, repo_details, username, new_updates)
+
+            # Increment the page number for the next request
+            page += 1
+
+        else:
+            print(f"Failed to fetch events for {username}, Status Code: {response.status_code}")
+            return None  # Exit if the request fails
+
+    # If checkpoint not found -- 90 days gap  
+    if not checkpoint_reached:
+        return 'redirect'
+
+    return new_updates, latest_snapshot_id
 
 
 def handle_issue_event(event, username):
@@ -713,7 +1623,7 @@ def handle_pull_request_event(event, repo_detail, username):
 
         # Fetch Commits
         commits_url = data['commits_url']
-        response = requests.get(commits_url, headers=HEADERS)
+        response = get_http().get(commits_url, headers=HEADERS)
 
         if response.status_code == 200:
             fetched_commits = response.json()
@@ -739,6 +1649,27 @@ def handle_pull_request_event(event, repo_detail, username):
         # Return the current PR directly
         return False, (pr_details['number'], pr_details)
 
+def get_new_pr_commits(repo_details, pr_no, username):
+    """Commits of the user in a stored PR that aren't stored yet."""
+    stored = next((pr for pr in repo_details['pull_requests'] if pr['pr_number'] == pr_no), None)
+    if not stored:
+        return []
+
+    known = {commit['sha'] for commit in stored['commits']}
+    commits_url = f"{BASE_URL}/repos/{repo_details['full_name']}/pulls/{pr_no}/commits"
+
+    new_commits = []
+    for commits in iter_paginated(commits_url):
+        for commit in commits:
+            if commit['sha'] in known or get_login(commit['author']) != username:
+                continue
+
+            details = get_commit_details_from_SHA(repo_details['full_name'], commit['sha'])
+            if details:
+                new_commits.append(details)
+
+    return new_commits
+
 def handle_pull_request_review_event(event,username):
     
     comments_data = []
@@ -758,7 +1689,7 @@ def handle_pull_request_review_event(event,username):
 
         # Fetch all the comments
         comment_url = review['pull_request_url'] + f"/reviews/{review['id']}/comments"
-        response = requests.get(comment_url, headers=HEADERS)
+        response = get_http().get(comment_url, headers=HEADERS)
 
         if response.status_code == 200:
             fetched_comments = response.json()
@@ -793,7 +1724,7 @@ def handle_push_event(event, repo_details):
     else:
         
         url = f"{BASE_URL}/repos/{event['repo']['name']}/commits/{commit_sha}/pulls"
-        response = requests.get(url, headers=HEADERS)
+        response = get_http().get(url, headers=HEADERS)
         
         if response.status_code == 200:
             pulls = response.json()
@@ -810,9 +1741,534 @@ def handle_push_event(event, repo_details):
 
 
 
+# STORE FUNCTIONS ------------------------------>
+
+def build_repo_details(user, user_info, repo, parent_repo, start_date):
+    """Full ingestion of <repo> for a user, stored under the user's document."""
+
+    username = user_info['login']
+    build_started = datetime.utcnow()
+
+    repo_details = {
+        "id": parent_repo["id"],
+        "name": parent_repo["name"],
+        "full_name": parent_repo["full_name"],
+        "description": parent_repo["description"],
+        "url": parent_repo["html_url"],
+        "created_at": parent_repo["created_at"],
+        "updated_at": parent_repo["updated_at"],
+        "language": parent_repo["language"],
+        "owner": {
+            "login": parent_repo["owner"]["login"],
+            "id": parent_repo["owner"]["id"],
+            "url": parent_repo["owner"]["html_url"]
+        },
+        "stars": parent_repo["stargazers_count"],
+        "watchers_count": parent_repo["watchers_count"],
+        "forks_count": parent_repo["forks_count"],
+        "open_issues_count": parent_repo["open_issues_count"],
+        "default_branch": parent_repo["default_branch"],
+        "visibility": parent_repo["visibility"],
+        "topics": get_repo_topics(parent_repo["full_name"]),
+        "covered_since": to_github_timestamp(start_date),
+        "covered_until": to_github_timestamp(build_started),
+    }
+
+    if COMMIT_MODE == 'lite':
+        repo_details['commits'] = get_user_global_commits_lite(parent_repo['full_name'], user_info['node_id'], start_date)
+    else:
+        repo_details['commits'] = get_user_global_commits(parent_repo['full_name'], user_info['login'], start_date)
+    if INGESTION_MODE == 'repo':
+        repo_details['issues'], repo_details['pull_requests'] = get_repo_user_view(repo_details['full_name'], user, start_date)
+    else:
+        repo_details['issues'] = get_user_issues(repo_details['full_name'], user, start_date)
+        repo_details['pull_requests'] = get_pr_details_commits_comments(repo_details['full_name'], user, start_date)
+
+
+
+
+    # Set the Snapshot -- For update tracking
+    event_url = f"{BASE_URL}/users/{username}/events?per_page=100"
+    response = get_http().get(event_url, headers=HEADERS)
+    
+    if response.status_code == 200:
+        data = response.json()
+
+        # Set Dummy Snapshot -- if No Previous Activity in 90 days / No Valid Event Found
+        repo_details['snapshot'] = '-1'
+
+        for event in data:
+            if (event['type'] in github_events) and (repo_details['name'] in event['repo']['name']):
+                latest_event_id = event['id']
+                repo_details['snapshot'] = latest_event_id
+                break
+
+    else:
+        print(f"Failed to fetch events for {username}")
+
+
+
+    # Upsert the user info and repo details into the database -- the version is stored with the data
+    repo_details['data_version'] = record_rebuild(username, repo)
+    collection.update_one(
+        {"user_info.login": user_info.get('login')}, 
+        {"$set": {"user_info": user_info, repo: repo_details}},
+        upsert=True
+    )
+
+    return repo_details
+
+def refresh_repo_details(username, repo, db_repo_details, start_date):
+    """Incremental update of a stored repo -- 'redirect' if it fell out of the events window."""
+
+    # Events created from here on are left to the next refresh
+    refresh_started = to_github_timestamp(datetime.utcnow())
+    collected = collect_repo_updates(username, db_repo_details, start_date)
+
+    # If the snapshot was not found -- 90 days outdated
+    if collected == 'redirect':
+        return collected
+
+    # Events couldn't be fetched -- nothing to store
+    if collected is None:
+        return db_repo_details
+
+    new_updates, snapshot_id = collected
+
+    def apply(repo_details):
+        # apply_updates consumes the buffer -- a retry after a conflict needs it again
+        apply_updates(repo_details, copy.deepcopy(new_updates))
+        repo_details['snapshot'] = snapshot_id
+        repo_details['covered_until'] = max(repo_details.get('covered_until') or '', refresh_started)
+
+    try:
+        latest_repo_data = store_repo_changes(username, repo, db_repo_details, apply)
+        print("DB Updated Successfully")
+    except Exception as e:
+        print(f"DB Update Failed -- {e}")
+        return db_repo_details
+
+    # Removed meanwhile -- rebuilt like any other missing repo
+    return latest_repo_data or 'redirect'
+
+def get_covered_since(repo_details):
+    """Start of the stored window -- it is covered from here up to covered_until."""
+    if repo_details.get('covered_since'):
+        return datetime.strptime(repo_details['covered_since'], "%Y-%m-%dT%H:%M:%SZ")
+
+    # Stored before coverage was tracked
+    return get_start_date()
+
+def get_covered_until(repo_details):
+    """Time of the last build / refresh -- None if unknown. Webhook deliveries keep it current on their own."""
+    if repo_details.get('covered_until'):
+        return datetime.strptime(repo_details['covered_until'], "%Y-%m-%dT%H:%M:%SZ")
+
+    return None
+
+def extend_repo_details(user, username, repo, repo_details, start_date):
+    """Widen the stored window back to <start_date> -- only the range before it is fetched."""
+    if not repo_details.get('covered_since'):
+        # Stored before coverage was tracked -- its build covered the default window, record that without fetching
+        default_since = to_github_timestamp(get_start_date())
+        repo_details = store_repo_changes(username, repo, repo_details,
+                                          lambda repo_details: repo_details.setdefault('covered_since', default_since)) or repo_details
+
+    # By day -- builds from before get_start_date() returned midnight are covered from some hour of that day
+    covered_since = get_covered_since(repo_details)
+    if start_date.date() >= covered_since.date():
+        return repo_details
+
+    print(f"Extending {username}/{repo} -- {to_github_timestamp(start_date)} to {repo_details.get('covered_since')}")
+    full_name = repo_details['full_name']
+
+    if COMMIT_MODE == 'lite':
+        user_info = get_user_info(username)
+        if not user_info:
+            return repo_details
+        commits = get_user_global_commits_lite(full_name, user_info['node_id'], start_date, covered_since)
+    else:
+        commits = get_user_global_commits(full_name, username, start_date, covered_since)
+
+    if INGESTION_MODE == 'repo':
+        issues, pull_requests = get_repo_user_view(full_name, user, start_date, covered_since)
+    else:
+        issues = get_user_issues(full_name, user, start_date, covered_since)
+        pull_requests = get_pr_details_commits_comments(full_name, user, start_date, covered_since)
+
+    def apply(repo_details):
+        # Commits are Old -> New, issues and PRs New -> Old
+        known_commits = {commit['sha'] for commit in repo_details['commits'] if commit}
+        known_issues = {issue['number'] for issue in repo_details['issues']}
+        known_prs = {pr['pr_number'] for pr in repo_details['pull_requests']}
+
+        repo_details['commits'] = [commit for commit in commits if commit['sha'] not in known_commits] + repo_details['commits']
+        repo_details['issues'] += [issue for issue in issues if issue['number'] not in known_issues]
+        repo_details['pull_requests'] += [pr for pr in pull_requests if pr['pr_number'] not in known_prs]
+        repo_details['covered_since'] = min(repo_details.get('covered_since') or to_github_timestamp(covered_since),
+                                            to_github_timestamp(start_date))
+
+    return store_repo_changes(username, repo, repo_details, apply) or repo_details
+
+def filter_repo_window(repo_details, start_date, end_date=None):
+    """Stored repo details cut down to a narrower window -- no GitHub calls."""
+    since = to_github_timestamp(start_date)
+    until = to_github_timestamp(end_date) if end_date else None
+
+    def within(date):
+        return bool(date) and date >= since and (until is None or date < until)
+
+    filtered = dict(repo_details)
+    filtered['commits'] = [commit for commit in repo_details['commits'] if commit and within(commit['date'])]
+    filtered['pull_requests'] = [pr for pr in repo_details['pull_requests']
+                                    if pr['pr_details'] and within(pr['pr_details']['date'])]
+    # Same rule as ingestion -- updated inside the window, created before its end
+    filtered['issues'] = [issue for issue in repo_details['issues']
+                            if issue['updated_at'] >= since and (until is None or issue['created_at'] < until)]
+    filtered['window'] = {"since": since, "until": until}
+
+    return filtered
+
+def count_items(repo_details):
+    return len(repo_details['commits']) + len(repo_details['pull_requests']) + len(repo_details['issues'])
+
+def record_view(username, repo):
+    refresh_queue.update_one(
+        {'_id': f"{username}/{repo}"},
+        {'$set': {'login': username, 'repo': repo, 'last_viewed': datetime.utcnow()}},
+        upsert=True
+    )
+
+def mark_refreshed(username, repo, changes):
+    """Record a refresh and fold its changes into the activity rate (changes per day, moving average)."""
+    now = datetime.utcnow()
+    entry = refresh_queue.find_one({'_id': f"{username}/{repo}"}) or {}
+
+    activity = entry.get('activity', 0.0)
+    if entry.get('last_refreshed'):
+        days = max((now - entry['last_refreshed']).total_seconds() / 86400, 1 / 24)
+        activity = 0.7 * activity + 0.3 * (changes / days)
+
+    refresh_queue.update_one(
+        {'_id': f"{username}/{repo}"},
+        {'$set': {'login': username, 'repo': repo, 'last_refreshed': now, 'activity': activity}},
+        upsert=True
+    )
+
+def is_recently_refreshed(username, repo):
+    entry = refresh_queue.find_one({'_id': f"{username}/{repo}"})
+    return bool(entry and entry.get('last_refreshed')) and datetime.utcnow() - entry['last_refreshed'] < timedelta(minutes=REFRESH_FRESH_FOR)
+
+
+
+# CHANGE FEED FUNCTIONS ------------------------------>
+# Every change to a stored (user, repo) gets the next version number, so a client that saw version N
+# only downloads what changed since. The log keeps the last CHANGE_LOG_LIMIT changes per repo.
+
+def feed_key(username, repo):
+    return f"{username}/{repo}"
+
+def feed_snapshot(repo_details):
+    """What diff_repo_details compares against -- taken before repo_details is updated in place."""
+    return {
+        'commits': {commit['sha'] for commit in repo_details['commits'] if commit},
+        'pull_requests': {pr['pr_number']: (pr['pr_details'], len(pr['commits']), len(pr['comments']))
+                            for pr in repo_details['pull_requests']},
+        'issues': {issue['number']: dict(issue) for issue in repo_details['issues']},
+    }
+
+def diff_repo_details(snapshot, repo_details):
+    """(kind, op, data) for everything added or changed since <snapshot>."""
+    changes = []
+
+    for commit in repo_details['commits']:
+        if commit and commit['sha'] not in snapshot['commits']:
+            changes.append(('commit', 'added', commit))
+
+    for pr in repo_details['pull_requests']:
+        previous = snapshot['pull_requests'].get(pr['pr_number'])
+
+        if previous is None:
+            changes.append(('pull_request', 'added', pr))
+            continue
+
+        pr_details, commit_count, comment_count = previous
+        if pr['pr_details'] != pr_details:
+            changes.append(('pull_request', 'updated', {'pr_number': pr['pr_number'], 'pr_details': pr['pr_details']}))
+        for commit in pr['commits'][commit_count:]:
+            changes.append(('commit', 'added', {**commit, 'pr_number': pr['pr_number']}))
+        for comment in pr['comments'][comment_count:]:
+            changes.append(('comment', 'added', {**comment, 'pr_number': pr['pr_number']}))
+
+    for issue in repo_details['issues']:
+        previous = snapshot['issues'].get(issue['number'])
+
+        if previous is None:
+            changes.append(('issue', 'added', issue))
+        elif issue != previous:
+            changes.append(('issue', 'updated', issue))
+
+    return changes
+
+def allocate_versions(key, count, floor=False):
+    """Reserve <count> versions, returns the last one. floor=True drops everything before them from the feed."""
+    counter = change_counters.find_one_and_update(
+        {'_id': key},
+        {'$inc': {'version': count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    version = counter['version']
+
+    # Older versions can't be served anymore -- clients below the floor get the full data
+    floor_version = version if floor else version - CHANGE_LOG_LIMIT
+    change_counters.update_one({'_id': key}, {'$max': {'floor': floor_version}})
+    change_log.delete_many({'key': key, 'version': {'$lte': floor_version}})
+
+    return version
+
+def log_changes(key, last, changes):
+    """Write the rows of versions up to <last> -- get_changes_since serves nothing past a missing one."""
+    now = datetime.utcnow()
+
+    change_log.insert_many([
+        {'key': key, 'version': version, 'kind': kind, 'op': op, 'data': data, 'at': now}
+        for version, (kind, op, data) in zip(range(last - len(changes) + 1, last + 1), changes)
+    ])
+
+def store_repo_changes(username, repo, repo_details, apply, attempts=5):
+    """Run <apply> on repo_details and store the result, only if nobody else wrote the repo since it was read.
+
+    On a conflict the repo is reloaded and <apply> runs again, so it must only merge what was already fetched.
+    The new version is stored with the data, its log rows are written right after -- a full read never gets
+    data newer than its X-Data-Version. Returns the stored repo details, None if the repo was removed.
+    """
+    ensure_indexes()
+    key = feed_key(username, repo)
+    items = ('commits', 'pull_requests', 'issues')
+
+    for _ in range(attempts):
+        read_version = repo_details.get('data_version')
+        snapshot = feed_snapshot(repo_details)
+        metadata = {field: value for field, value in repo_details.items() if field not in items}
+
+        apply(repo_details)
+        changes = diff_repo_details(snapshot, repo_details)
+
+        if not changes and metadata == {field: value for field, value in repo_details.items() if field not in items}:
+            return repo_details
+
+        # Only item changes move the version -- snapshot / coverage updates don't concern feed clients
+        last = allocate_versions(key, len(changes)) if changes else None
+        if last:
+            repo_details['data_version'] = last
+
+        result = collection.update_one(
+            {"user_info.login": username, f"{repo}.data_version": read_version if read_version is not None else {'$exists': False}},
+            {"$set": {repo: repo_details}}
+        )
+
+        if result.matched_count:
+            if changes:
+                log_changes(key, last, changes)
+            return repo_details
+
+        # Lost the race -- fill the reserved versions so feed clients don't wait on them
+        if changes:
+            log_changes(key, last, [('void', 'void', None)] * len(changes))
+
+        print(f"Write Conflict -- {username}/{repo}, reloading")
+        db_user_data = collection.find_one({"user_info.login": username})
+        repo_details = db_user_data.get(repo) if db_user_data else None
+        if not repo_details:
+            return None
+
+    raise RuntimeError(f"Write conflicts on {username}/{repo} after {attempts} attempts")
+
+def record_rebuild(username, repo):
+    """A full build replaces everything -- earlier versions are no longer comparable."""
+    return allocate_versions(feed_key(username, repo), 1, floor=True)
+
+def get_data_version(username, repo, repo_details):
+    # Stored before versions were kept with the data
+    if 'data_version' in repo_details:
+        return repo_details['data_version']
+
+    counter = change_counters.find_one({'_id': feed_key(username, repo)})
+    return counter['version'] if counter else 0
+
+def get_changes_since(username, repo, since_version):
+    """(version, changes) after <since_version> -- changes is None if they were already compacted away or lost.
+
+    Versions are reserved before their rows are written, so only the run without gaps is served:
+    a missing version still in flight is picked up by the next poll.
+    """
+    counter = change_counters.find_one({'_id': feed_key(username, repo)}) or {'version': 0, 'floor': 0}
+
+    if since_version < counter.get('floor', 0) or since_version > counter['version']:
+        return counter['version'], None
+
+    cursor = change_log.find(
+        {'key': feed_key(username, repo), 'version': {'$gt': since_version}},
+        {'_id': 0, 'key': 0}
+    ).sort('version', 1)
+
+    version = since_version
+    changes = []
+    for change in cursor:
+        if change['version'] != version + 1:
+            # Rows after the gap are old -- its writer failed, the client has to start over
+            if (datetime.utcnow() - change['at']).total_seconds() > CHANGE_GAP_TIMEOUT:
+                return counter['version'], None
+            break
+
+        version = change['version']
+        # Reserved by a write that lost a conflict
+        if change['kind'] != 'void':
+            changes.append(change)
+
+    return version, changes
+
+
+
+# WEBHOOK FUNCTIONS ------------------------------>
+# Deliveries are converted to the Events API shape and run through the same handlers as collect_repo_updates.
+# They are queued in webhook_deliveries before GitHub gets its 202 -- GitHub doesn't redeliver on its own,
+# so a worker restart must not lose them. Each delivery is marked applied only once it is stored.
+
+# Webhook event -> Events API type
+webhook_events = {
+    "issues": "IssuesEvent",
+    "pull_request": "PullRequestEvent",
+    "pull_request_review": "PullRequestReviewEvent",
+    "push": "PushEvent"
+}
+
+def covers_webhook_events(events):
+    """A hook replaces polling only if it sends every event polling would pick up."""
+    return '*' in events or set(webhook_events) <= set(events)
+
+# Single thread per worker drains the queue, oldest delivery first
+webhook_executor = ThreadPoolExecutor(max_workers=1)
+
+def verify_webhook_signature(body, signature):
+    if not GITHUB_WEBHOOK_SECRET or not signature:
+        return False
+
+    expected = "sha256=" + hmac.new(GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def webhook_to_event(event_name, delivery_id, payload):
+    """Build an Events API style event from a webhook delivery, None if it carries no update."""
+
+    match event_name:
+        case 'push':
+            # Branch deletions have no commits
+            if not payload.get('commits'):
+                return None
+
+            # Webhook commits carry the SHA as 'id'
+            payload['commits'] = [{**commit, 'sha': commit['id']} for commit in payload['commits']]
+
+        case 'pull_request_review':
+            # Edits and dismissals don't add comments
+            if payload.get('action') != 'submitted':
+                return None
+
+    return {
+        'id': delivery_id,
+        'type': webhook_events[event_name],
+        'repo': {'name': payload['repository']['full_name']},
+        'payload': payload,
+        'created_at': to_github_timestamp(datetime.utcnow())
+    }
+
+def has_active_webhook(repo_full_name):
+    webhook = webhook_repos.find_one({'repo': repo_full_name})
+    if not webhook or not webhook.get('last_delivery'):
+        return False
+
+    # Hooks with a partial event list (or unknown, installed before it was recorded) keep polling on
+    if not covers_webhook_events(webhook.get('events', [])):
+        return False
+
+    # Fall back to polling if the webhook has gone quiet (removed / failing)
+    return datetime.utcnow() - webhook['last_delivery'] < timedelta(days=WEBHOOK_MAX_SILENCE)
+
+def apply_webhook_event(event, username):
+    """Apply one delivery to the stored repo data of the user who triggered it -- raises if it couldn't be stored."""
+
+    db_user_data = collection.find_one({"user_info.login": username})
+    if not db_user_data:
+        return
+
+    for repo, repo_details in db_user_data.items():
+        # Same repo match as collect_repo_updates
+        if not isinstance(repo_details, dict) or 'snapshot' not in repo_details:
+            continue
+        if repo_details['name'] not in event['repo']['name']:
+            continue
+
+        new_updates = new_update_buffer()
+        collect_event_update(event, repo_details, username, new_updates)
+
+        store_repo_changes(username, repo, repo_details,
+                           lambda repo_details: apply_updates(repo_details, copy.deepcopy(new_updates)))
+        print(f"Webhook Applied -- {event['type']} -> {username}/{repo}")
+
+    # Let the next view re-scan the shared index
+    repo_scans.update_one({'repo': event['repo']['name']}, {'$unset': {'scanned_at': ""}})
+
+def claim_webhook_delivery():
+    """Oldest due delivery, claimed for this worker -- claims of crashed workers expire."""
+    now = datetime.utcnow()
+
+    return webhook_deliveries.find_one_and_update(
+        {'$or': [
+            {'status': 'pending', 'retry_at': {'$lte': now}},
+            {'status': 'applying', 'claimed_at': {'$lt': now - timedelta(seconds=WEBHOOK_CLAIM_TIMEOUT)}},
+        ]},
+        {'$set': {'status': 'applying', 'claimed_at': now}, '$inc': {'attempts': 1}},
+        sort=[('received_at', 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+def process_webhook_deliveries():
+    """Apply every due delivery in the queue. Also run by the refresher, which picks up retries and crashed claims."""
+    while (delivery := claim_webhook_delivery()):
+        event = delivery['event']
+
+        try:
+            apply_webhook_event(event, delivery['login'])
+        except Exception as e:
+            print(f"Webhook Update Failed -- {event['type']} {event['id']} (attempt {delivery['attempts']}): {e}")
+
+            if delivery['attempts'] >= WEBHOOK_MAX_ATTEMPTS:
+                webhook_deliveries.update_one({'_id': delivery['_id']}, {'$set': {'status': 'failed', 'error': str(e)}})
+
+                # Polling picks up what the delivery carried -- until the next delivery arrives
+                webhook_repos.update_one({'repo': event['repo']['name']}, {'$unset': {'last_delivery': ""}})
+            else:
+                retry_at = datetime.utcnow() + timedelta(minutes=delivery['attempts'])
+                webhook_deliveries.update_one({'_id': delivery['_id']}, {'$set': {'status': 'pending', 'retry_at': retry_at}})
+            continue
+
+        webhook_deliveries.update_one(
+            {'_id': delivery['_id']},
+            {'$set': {'status': 'applied', 'applied_at': datetime.utcnow()}, '$unset': {'event': ""}}
+        )
+
+def drain_webhook_deliveries():
+    try:
+        process_webhook_deliveries()
+    except Exception as e:
+        print(f"Webhook Queue Failed -- {e}")
+
+
+
 #Direct Frontend-Backend Mapping Routes -------------->
 
-@app.route('/<user>', methods=['GET', 'POST'])
+@routes.route('/<user>', methods=['GET', 'POST'])
 def get_user(user):
     login_name = get_login_name(user)
     
@@ -828,11 +2284,17 @@ def get_user(user):
 
 
 
-@app.route('/<user>/contributions', methods=['GET','POST'])
+@routes.route('/<user>/contributions', methods=['GET','POST'])
 def get_contributions(user):
 
     username = user
-    user_contributions = get_user_contributions(username)
+
+    try:
+        start, end = get_contribution_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date range -- use YYYY-MM-DD: {e}"}), 400
+
+    user_contributions = get_user_contributions(username, start, end)
 
     if user_contributions:
         return jsonify(user_contributions)
@@ -841,30 +2303,105 @@ def get_contributions(user):
 
 
 
-@app.route('/<user>/repos', methods=['GET','POST'])
+@routes.route('/contributions/team', methods=['GET','POST'])
+def get_team_contributions():
+
+    users = request.args.get('users', '').split(',') if request.args.get('users') else (request.get_json(silent=True) or {}).get('users', [])
+    users = [user.strip() for user in users if user and user.strip()]
+
+    if not users:
+        return jsonify({"error": "Provide users -> ?users=a,b,c or {\"users\": [...]}"}), 400
+
+    try:
+        start, end = get_contribution_range(request.args)
+        window = int(request.args.get('window', 7))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameters: {e}"}), 400
+
+    # Emails are resolved in bulk
+    emails = resolve_logins([user for user in users if is_email(user)])
+    logins = list(dict.fromkeys(emails.get(user.lower()) if is_email(user) else user for user in users))
+    logins = [login for login in logins if login]
+
+    days = get_contribution_days(logins, start, end)
+    dates = [(start + timedelta(days=offset)).isoformat() for offset in range((min(end, datetime.utcnow().date()) - start).days + 1)]
+
+    import analytics  # numpy -- only loaded by the analytics routes
+
+    summary = analytics.team_summary(logins, [days[login] for login in logins], dates, max(window, 1), request.args.get('series') == 'true')
+
+    return jsonify({"from": start.isoformat(), "to": end.isoformat(), "users": summary})
+
+
+
+@routes.route('/<user>/repos', methods=['GET','POST'])
 def get_user_repos(user):
 
     username = user
     user_repos = get_user_repositories(username)
 
-    repo_names = [repo['name'] for repo in user_repos]
-
     if user_repos:
-        return jsonify(repo_names)
+        user_repos = filter_repositories(user_repos, request.args)
+
+        # Full summaries only on request -- names by default
+        if request.args.get('details') == 'true':
+            return jsonify(user_repos)
+
+        return jsonify([repo['name'] for repo in user_repos])
     else:
         return jsonify({"error": f"Something Went Wrong -- fetching All Repos --> {username}"}), 500 
         
 
 
+@routes.route('/users/resolve', methods=['POST'])
+def resolve_users():
+
+    emails = (request.get_json(silent=True) or {}).get('emails', [])
+    emails = [email for email in emails if isinstance(email, str) and is_email(email)]
+
+    if not emails:
+        return jsonify({"error": "Provide a list of emails -> {\"emails\": [...]}"}), 400
+
+    return jsonify(resolve_logins(emails))
+
+
 
 # Mapping Backend -- MongoDB -- Frontend Routes ------------>
 
-@app.route('/<user>/<repo>/repo_details', methods=['GET', 'POST'])
+def repo_details_response(username, repo, repo_details, since_version=None, window=None):
+    """Full repo details (cut to <window>), or only the changes after <since_version> -- the current version is always included."""
+    if since_version is not None:
+        version, changes = get_changes_since(username, repo, since_version)
+
+        if changes is not None:
+            return jsonify({"version": version, "changes": changes}), 200
+
+        # Compacted or rebuilt since -- the client has to start over
+        return jsonify({"version": get_data_version(username, repo, repo_details), "reset": True, "repo_details": repo_details}), 200
+
+    if window:
+        repo_details = filter_repo_window(repo_details, *window)
+
+    response = jsonify(repo_details)
+    response.headers['X-Data-Version'] = str(get_data_version(username, repo, repo_details))
+
+    return response, 200
+
+@routes.route('/<user>/<repo>/repo_details', methods=['GET', 'POST'])
 def get_repo_data_from_db(user, repo):
 
     invalid = False
     username = get_login_name(user)
-    start_date = get_start_date()  
+
+    # ?since=&until= -- the last 365 days by default
+    try:
+        start_date, end_date = get_request_window(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid window -- use YYYY-MM-DD: {e}"}), 400
+    window = (start_date, end_date)
+
+    # Clients that already hold version N only get the changes after it
+    since_version = request.args.get('since_version', type=int)
 
     # Check if the user exists in the database
     db_user_data = collection.find_one({"user_info.login": username})  
@@ -886,114 +2423,174 @@ def get_repo_data_from_db(user, repo):
         if not user_info:
             return jsonify({"error": f"User data not found for {user}"}), 404
 
-        user_repos = get_user_repositories(user)
-
-        # Find the requested repo details
-        parent_repo = next((base_repo for base_repo in user_repos if base_repo['name'] == repo), None)
+        # Direct lookup -- no listing scan, forks come with their parent
+        parent_repo = get_repository(username, repo)
         if parent_repo is None:
             return jsonify({"error": f"{repo} Repository does not exist for user {user}."}), 404
-        
 
+        # If the repo is a fork, use its parent repo details
+        if parent_repo['fork'] and parent_repo.get('parent'):
+            parent_repo = parent_repo['parent']
 
+        repo_details = build_repo_details(user, user_info, repo, parent_repo, start_date)
+        record_view(user_info['login'], repo)
+        mark_refreshed(user_info['login'], repo, 0)
 
-        # If the repo is a fork, get its parent repo details
-        if parent_repo['fork']:
-            repo_full_name = parent_repo['full_name']
-            parent_url = f"{BASE_URL}/repos/{repo_full_name}"
-            parent_response = requests.get(parent_url, headers=HEADERS)
-
-            if parent_response.status_code == 200:
-                response = parent_response.json()
-                parent_repo = response['parent']
-
-        repo_details = {
-            "id": parent_repo["id"],
-            "name": parent_repo["name"],
-            "full_name": parent_repo["full_name"],
-            "description": parent_repo["description"],
-            "url": parent_repo["html_url"],
-            "created_at": parent_repo["created_at"],
-            "updated_at": parent_repo["updated_at"],
-            "language": parent_repo["language"],
-            "owner": {
-                "login": parent_repo["owner"]["login"],
-                "id": parent_repo["owner"]["id"],
-                "url": parent_repo["owner"]["html_url"]
-            },
-            "stars": parent_repo["stargazers_count"],
-            "watchers_count": parent_repo["watchers_count"],
-            "forks_count": parent_repo["forks_count"],
-            "open_issues_count": parent_repo["open_issues_count"],
-            "default_branch": parent_repo["default_branch"],
-            "visibility": parent_repo["visibility"],
-            "topics": get_repo_topics(parent_repo["full_name"]),
-        }
+        return repo_details_response(user_info['login'], repo, repo_details, since_version, window)
 
-        repo_details['commits'] = get_user_global_commits(parent_repo['full_name'], user_info['login'], start_date)
-        repo_details['issues'] = get_user_issues(repo_details['full_name'], user, start_date)
-        repo_details['pull_requests'] = get_pr_details_commits_comments(repo_details['full_name'], user, start_date)
+    # If both user and repo exist, update DB and Return Data
+    else:
 
+        record_view(username, repo)
 
+        # Wider than what is stored -- fetch only the uncovered range
+        db_repo_details = extend_repo_details(user, username, repo, db_repo_details, start_date)
 
+        # Kept up to date by webhook deliveries / the background refresher -- no polling.
+        # A window that ends before the last refresh is served from the store as well.
+        covered_until = get_covered_until(db_repo_details)
+        if end_date and covered_until and end_date <= covered_until \
+                or has_active_webhook(db_repo_details['full_name']) or is_recently_refreshed(username, repo):
+            return repo_details_response(username, repo, db_repo_details, since_version, window)
 
-        # Set the Snapshot -- For update tracking
-        event_url = f"{BASE_URL}/users/{username}/events?per_page=100"
-        response = requests.get(event_url, headers=HEADERS)
+        items_before = count_items(db_repo_details)
+        latest_repo_data = refresh_repo_details(username, repo, db_repo_details, get_covered_since(db_repo_details))
         
-        if response.status_code == 200:
-            data = response.json()
+        # If the snapshot was not found -- 90 days outdated
+        if latest_repo_data == 'redirect':
+            try:
+                collection.update_one(
+                    {"user_info.login": username},
+                    {"$unset": {repo: ""}}  # Remove the repo entirely
+                )         
+                # Call Same route without repo -- keeping the window
+                return redirect(f'/{username}/{repo}/repo_details?{request.query_string.decode()}')
+            except:
+                return jsonify({"error":"Redirect Failed"}), 500
 
-            # Set Dummy Snapshot -- if No Previous Activity in 90 days / No Valid Event Found
-            repo_details['snapshot'] = '-1'
+        mark_refreshed(username, repo, count_items(latest_repo_data) - items_before)
 
-            for event in data:
-                if (event['type'] in github_events) and (repo_details['name'] in event['repo']['name']):
-                    latest_event_id = event['id']
-                    repo_details['snapshot'] = latest_event_id
-                    break
+        return repo_details_response(username, repo, latest_repo_data, since_version, window)
 
-        else:
-            print(f"Failed to fetch events for {username}")
 
 
+@routes.route('/repos/<owner>/<repo>/commits/<sha>/files', methods=['GET'])
+def get_commit_file_list(owner, repo, sha):
 
-        # Upsert the user info and repo details into the database
-        collection.update_one(
-            {"user_info.login": user_info.get('login')}, 
-            {"$set": {"user_info": user_info, repo: repo_details}},
-            upsert=True
-        )
+    files = get_commit_files(f"{owner}/{repo}", sha)
 
-        return jsonify(repo_details), 200  
+    if files:
+        return jsonify(files)
+    else:
+        return jsonify({"error": f"Commit {sha} not found in {owner}/{repo}"}), 404
 
-    # If both user and repo exist, update DB and Return Data
+
+
+# Export Routes ------------>
+
+@routes.route('/export', methods=['GET'])
+def export_data():
+
+    kinds = request.args.get('kind', 'commits').split(',')
+    file_format = request.args.get('format', 'csv')
+    users = [user.strip() for user in request.args.get('users', '').split(',') if user.strip()]
+    repos = [repo.strip() for repo in request.args.get('repos', '').split(',') if repo.strip()]
+
+    if any(kind not in export.COLUMNS for kind in kinds):
+        return jsonify({"error": f"Invalid kind -- choose from {', '.join(export.COLUMNS)}"}), 400
+    if file_format not in ('csv', 'xlsx'):
+        return jsonify({"error": "Invalid format -- choose from csv, xlsx"}), 400
+    if file_format == 'csv' and len(kinds) != 1:
+        return jsonify({"error": "CSV exports one kind at a time -- use format=xlsx for several"}), 400
+    if not users and not repos:
+        return jsonify({"error": "Provide users and/or repos -> ?users=a,b&repos=x,y"}), 400
+
+    # Emails are resolved in bulk
+    emails = resolve_logins([user for user in users if is_email(user)])
+    logins = [emails.get(user.lower()) if is_email(user) else user for user in users]
+    logins = [login for login in logins if login]
+
+    def rows(kind):
+        for pipeline in export.pipelines(kind, logins, repos):
+            for doc in collection.aggregate(pipeline, allowDiskUse=True, batchSize=EXPORT_BATCH_SIZE):
+                yield export.to_row(kind, doc)
+
+    filename = f"dashboard_{'_'.join(kinds)}_{datetime.utcnow().strftime('%Y%m%d')}.{file_format}"
+
+    if file_format == 'csv':
+        body = export.stream_csv(export.COLUMNS[kinds[0]], rows(kinds[0]))
+        mimetype = 'text/csv'
     else:
+        # Built in full before the first byte is sent -- large exports are better taken as CSV
+        body = export.stream_xlsx([(kind, export.COLUMNS[kind], rows(kind)) for kind in kinds])
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
-        latest_repo_data = update_repo_details(username, db_repo_details, start_date)
-        
-        # If the snapshot was not found -- 90 days outdated
-        if latest_repo_data == 'redirect':
-            try:
-                collection.update_one(
-                    {"user_info.login": username},
-                    {"$unset": {repo: ""}}  # Remove the repo entirely
-                )         
-                return redirect(f'/{username}/{repo}/repo_details') # Call Same route without repo
-            except:
-                return jsonify({"error":"Redirect Failed"}), 500
-            
-        try:
-            collection.update_one(
-                {"user_info.login": username}, 
-                {"$set": {repo: latest_repo_data}},
-                upsert=True
-            )
-            print("DB Updated Successfully")
-        except:
-            print("DB Update Failed")
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+
+# Webhook Routes ------------>
+
+@routes.route('/webhooks/github', methods=['POST'])
+def github_webhook():
+
+    body = request.get_data()
+    if not verify_webhook_signature(body, request.headers.get('X-Hub-Signature-256')):
+        return jsonify({"error": "Invalid webhook signature"}), 401
+
+    ensure_indexes()
+
+    event_name = request.headers.get('X-GitHub-Event')
+    delivery_id = request.headers.get('X-GitHub-Delivery')
+    payload = request.get_json(silent=True) or {}
+
+    repo_full_name = payload.get('repository', {}).get('full_name')
+    if not repo_full_name:
+        return jsonify({"status": "ignored"}), 200
+
+    # 'ping' on install carries the hook's event list -- deliveries keep the hook alive
+    webhook = {'last_delivery': datetime.utcnow()}
+    if event_name == 'ping':
+        webhook['events'] = payload.get('hook', {}).get('events', [])
+
+    webhook_repos.update_one(
+        {'repo': repo_full_name},
+        {'$set': webhook},
+        upsert=True
+    )
+
+    if event_name not in webhook_events:
+        return jsonify({"status": "ignored"}), 200
+
+    event = webhook_to_event(event_name, delivery_id, payload)
+    if event is None:
+        return jsonify({"status": "ignored"}), 200
+
+    # Queued before acknowledging -- a manual redelivery of a known id is a duplicate
+    now = datetime.utcnow()
+    try:
+        webhook_deliveries.insert_one({
+            '_id': delivery_id,
+            'status': 'pending',
+            'event': event,
+            'login': payload['sender']['login'],
+            'attempts': 0,
+            'received_at': now,
+            'retry_at': now
+        })
+    except DuplicateKeyError:
+        return jsonify({"status": "duplicate"}), 200
+
+    webhook_executor.submit(drain_webhook_deliveries)
+
+    return jsonify({"status": "accepted"}), 202
 
-        return jsonify(latest_repo_data), 200
 
+app = create_app()
 
 if __name__ == '__main__':
     app.run()
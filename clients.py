@@ -0,0 +1,249 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+import requests
+from urllib.parse import urlparse
+from pymongo import MongoClient, monitoring
+from http_cache import cache_key, get_policy, get_response_cache, to_response
+
+# Shared clients -- created on first use and re-created after a fork,
+# so importing the app never opens a connection and gunicorn workers don't share sockets.
+
+_mongo_client = None
+_mongo_pid = None
+_mongo_lock = threading.Lock()
+
+_http = threading.local()
+_timings = threading.local()
+
+RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', 5))
+RETRY_BACKOFF = float(os.getenv('RETRY_BACKOFF', 1.0))         # Seconds, doubled per attempt
+RETRY_MAX_BACKOFF = float(os.getenv('RETRY_MAX_BACKOFF', 30))  # Cap of a single backoff
+RETRY_MAX_WAIT = float(os.getenv('RETRY_MAX_WAIT', 90))        # Longest Retry-After / reset wait still worth sleeping
+RETRY_CONNECT_TIMEOUT = float(os.getenv('RETRY_CONNECT_TIMEOUT', 5))  # Seconds to connect, per attempt
+RETRY_READ_TIMEOUT = float(os.getenv('RETRY_READ_TIMEOUT', 30))       # Seconds without a byte from GitHub, per attempt
+BREAKER_THRESHOLD = int(os.getenv('BREAKER_THRESHOLD', 5))     # Failed requests in a row before a host is cut off
+BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', 30))    # Seconds before an open host is tried again
+
+RETRY_STATUSES = {500, 502, 503, 504}
+
+
+def reset_timings():
+    _timings.start = time.perf_counter()
+    _timings.spent = {'github': 0.0, 'mongo': 0.0}
+
+def add_timing(kind, seconds):
+    if getattr(_timings, 'spent', None) is not None:
+        _timings.spent[kind] += seconds
+
+def get_timings():
+    """Seconds the current request spent waiting on GitHub / Mongo, the rest is the app itself (incl. JSON)."""
+    if getattr(_timings, 'spent', None) is None:
+        return {}
+
+    total = time.perf_counter() - _timings.start
+    return {**_timings.spent, 'app': max(0.0, total - sum(_timings.spent.values())), 'total': total}
+
+class MongoTimer(monitoring.CommandListener):
+    # Sync commands report on the calling thread, so the time lands on the right request
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        add_timing('mongo', event.duration_micros / 1e6)
+
+    def failed(self, event):
+        add_timing('mongo', event.duration_micros / 1e6)
+
+def get_mongo_client():
+    global _mongo_client, _mongo_pid
+
+    if _mongo_client is None or _mongo_pid != os.getpid():
+        with _mongo_lock:
+            if _mongo_client is None or _mongo_pid != os.getpid():
+                # connect=False -- the first query opens the connection, not the constructor
+                _mongo_client = MongoClient(
+                    os.getenv('MONGO_URI'),
+                    connect=False,
+                    serverSelectionTimeoutMS=int(os.getenv('MONGO_TIMEOUT_MS', 5000)),
+                    event_listeners=[MongoTimer()] if os.getenv('TIMING_HEADERS', 'false').lower() == 'true' else []
+                )
+                _mongo_pid = os.getpid()
+
+    return _mongo_client
+
+def get_db():
+    return get_mongo_client()[os.getenv('MONGO_DB', 'dashboard')]
+
+class LazyCollection:
+    """Stand-in for a pymongo collection, resolved against the current process' client on every use."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
+
+class GitHubUnavailable(Exception):
+    """GitHub kept failing after all retries -- the caller must not store what it has so far."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Stops calling a host after repeated failures, lets one trial request through per cooldown.
+
+    The trial's success closes the breaker, its failure keeps it open for another cooldown.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def check(self):
+        with self.lock:
+            if self.opened_at is not None:
+                now = time.monotonic()
+                remaining = BREAKER_COOLDOWN - (now - self.opened_at)
+                if remaining > 0:
+                    raise GitHubUnavailable(f"Circuit open for {self.host}", retry_after=remaining)
+
+                # This caller is the trial -- everyone else waits another cooldown (or for its success)
+                self.opened_at = now
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= BREAKER_THRESHOLD:
+                self.opened_at = time.monotonic()
+                print(f"Circuit opened for {self.host} -- {self.failures} failures")
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(host):
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+def backoff(attempt):
+    # Exponential with full jitter -- workers retrying together don't hit GitHub in lockstep
+    return random.uniform(0, min(RETRY_MAX_BACKOFF, RETRY_BACKOFF * 2 ** attempt))
+
+def retry_delay(response, attempt):
+    """Seconds to wait before retrying, None if the response is final."""
+    if response is None or response.status_code in RETRY_STATUSES:
+        return backoff(attempt)
+
+    if response.status_code in (403, 429):
+        if response.headers.get('Retry-After'):
+            return float(response.headers['Retry-After'])
+
+        # Primary rate limit -- wait for the reset
+        if response.headers.get('X-RateLimit-Remaining') == '0' and response.headers.get('X-RateLimit-Reset'):
+            return max(0.0, float(response.headers['X-RateLimit-Reset']) - time.time()) + 1
+
+        # Secondary rate limit without Retry-After -- GitHub asks for at least a minute
+        if 'secondary rate limit' in response.text.lower():
+            return max(60.0, backoff(attempt))
+
+    return None
+
+class RetrySession(requests.Session):
+    """Session with the shared retry policy: backoff with jitter for 5xx / connection errors,
+    Retry-After and rate limit resets for 403 / 429, and a circuit breaker per host.
+
+    Non-retryable responses (404, permission 403, ...) are returned as usual.
+    GETs go through the on-disk response cache when HTTP_CACHE_PATH is set (see http_cache).
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        policy = get_policy(url) if method.upper() == 'GET' and not args else None
+        cache = get_response_cache() if policy else None
+        if cache is None:
+            return self.retrying_request(method, url, *args, **kwargs)
+
+        full_url = requests.Request(method, url, params=kwargs.get('params')).prepare().url
+        key = cache_key(full_url, kwargs.get('headers'))
+
+        try:
+            entry = cache.get(key)
+        except sqlite3.Error as e:
+            print(f"HTTP Cache Failed -- {e}")
+            return self.retrying_request(method, url, *args, **kwargs)
+
+        if entry and cache.is_fresh(entry, policy):
+            return to_response(full_url, entry)
+
+        # Stale -- ask GitHub whether it changed, a 304 doesn't count against the rate limit
+        if entry and (entry['etag'] or entry['last_modified']):
+            headers = dict(kwargs.get('headers') or {})
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+            kwargs['headers'] = headers
+
+        response = self.retrying_request(method, url, *args, **kwargs)
+
+        try:
+            if response.status_code == 304 and entry:
+                cache.renew(key)
+                return to_response(full_url, entry)
+            if response.status_code == 200:
+                cache.put(key, full_url, response, policy)
+        except sqlite3.Error as e:
+            print(f"HTTP Cache Failed -- {e}")
+
+        return response
+
+    def retrying_request(self, method, url, *args, **kwargs):
+        # requests has no default -- a stalled connection would hold the thread forever
+        kwargs.setdefault('timeout', (RETRY_CONNECT_TIMEOUT, RETRY_READ_TIMEOUT))
+
+        breaker = get_breaker(urlparse(url).netloc)
+        breaker.check()
+
+        reason = None
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            started = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+                reason = f"{response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response = None
+                reason = type(e).__name__
+            add_timing('github', time.perf_counter() - started)
+
+            wait = retry_delay(response, attempt)
+            if wait is None:
+                breaker.record_success()
+                return response
+
+            if attempt == RETRY_ATTEMPTS or wait > RETRY_MAX_WAIT:
+                break
+
+            print(f"Retrying {method} {url} in {wait:.1f}s -- {reason} (attempt {attempt + 1}/{RETRY_ATTEMPTS})")
+            time.sleep(wait)
+
+        breaker.record_failure()
+        raise GitHubUnavailable(f"{method} {url} failed after retries -- {reason}", retry_after=wait)
+
+def get_http():
+    """Retrying session of the current thread -- keeps connections to GitHub alive between calls."""
+    if getattr(_http, 'session', None) is None or _http.pid != os.getpid():
+        _http.session = RetrySession()
+        _http.pid = os.getpid()
+
+    return _http.session
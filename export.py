@@ -0,0 +1,155 @@
+import io
+import os
+import csv
+import tempfile
+
+# Export of stored dashboard data -- rows are flattened by Mongo aggregation pipelines and
+# written one at a time, so the size of an export never decides the memory of a worker.
+
+COLUMNS = {
+    "commits": ["user", "repo", "pr_number", "sha", "date", "author", "branch", "message", "additions", "deletions", "url"],
+    "pull_requests": ["user", "repo", "number", "title", "state", "merged", "date", "commits", "additions", "deletions",
+                      "changed_files", "comments", "review_comments", "url"],
+    "reviews": ["user", "repo", "pr_number", "state", "date", "file", "comment", "url"],
+    "issues": ["user", "repo", "number", "title", "state", "type", "created_at", "updated_at", "labels"],
+}
+
+XLSX_MAX_ROWS = 1048576    # Rows per worksheet, header included -- Excel's hard limit
+
+# Column -> field inside the unwound item
+FIELDS = {
+    "commits": {"sha": "sha", "date": "date", "author": "author", "branch": "branch", "message": "message",
+                "additions": "stats.additions", "deletions": "stats.deletions", "url": "url"},
+    "pull_requests": {"number": "pr_number", "title": "pr_details.title", "state": "pr_details.state",
+                      "merged": "pr_details.merged", "date": "pr_details.date", "commits": "pr_details.commits",
+                      "additions": "pr_details.additions", "deletions": "pr_details.deletions",
+                      "changed_files": "pr_details.changed_files", "comments": "pr_details.comments",
+                      "review_comments": "pr_details.review_comments", "url": "pr_details.url"},
+    "reviews": {"state": "state", "date": "date", "file": "file", "comment": "comment", "url": "url"},
+    "issues": {"number": "number", "title": "title", "state": "state", "type": "type", "created_at": "created_at",
+               "updated_at": "updated_at", "labels": "labels"},
+}
+
+
+def repo_stage(logins, repos):
+    """One document per (user, stored repo) -- repos are keys of the user document."""
+    user_match = {"user_info.login": {"$in": logins}} if logins else {}
+    repo_match = {"repos.k": {"$in": repos}} if repos else {}
+
+    return [
+        {"$match": user_match},
+        {"$project": {"login": "$user_info.login", "repos": {"$objectToArray": "$$ROOT"}}},
+        {"$unwind": "$repos"},
+        {"$match": {"repos.v.full_name": {"$exists": True}, **repo_match}},
+        {"$project": {"login": 1, "repo": "$repos.v.full_name", "data": "$repos.v"}},
+    ]
+
+def flatten_stage(kind, path, extra=None):
+    """Project the unwound item at <path> onto the export columns of <kind>."""
+    project = {"_id": 0, "user": "$login", "repo": 1}
+    project.update({column: f"${path}.{field}" for column, field in FIELDS[kind].items()})
+    project.update(extra or {})
+
+    return {"$project": project}
+
+def pipelines(kind, logins, repos):
+    """Aggregation pipelines whose output documents are the rows of <kind>."""
+    base = repo_stage(logins, repos)
+
+    match kind:
+        case "commits":
+            # Global commits, then commits made inside PRs
+            return [
+                base + [
+                    {"$unwind": "$data.commits"},
+                    flatten_stage(kind, "data.commits", {"pr_number": {"$literal": None}}),
+                ],
+                base + [
+                    {"$unwind": "$data.pull_requests"},
+                    {"$unwind": "$data.pull_requests.commits"},
+                    flatten_stage(kind, "data.pull_requests.commits", {"pr_number": "$data.pull_requests.pr_number"}),
+                ],
+            ]
+        case "pull_requests":
+            return [base + [
+                {"$unwind": "$data.pull_requests"},
+                flatten_stage(kind, "data.pull_requests"),
+            ]]
+        case "reviews":
+            return [base + [
+                {"$unwind": "$data.pull_requests"},
+                {"$unwind": "$data.pull_requests.comments"},
+                flatten_stage(kind, "data.pull_requests.comments", {"pr_number": "$data.pull_requests.pr_number"}),
+            ]]
+        case "issues":
+            return [base + [
+                {"$unwind": "$data.issues"},
+                flatten_stage(kind, "data.issues"),
+            ]]
+
+    raise ValueError(f"Unknown export kind: {kind}")
+
+def to_row(kind, doc):
+    row = []
+    for column in COLUMNS[kind]:
+        value = doc.get(column)
+
+        # Labels are stored as GitHub label objects
+        if isinstance(value, list):
+            value = ", ".join(item["name"] if isinstance(item, dict) else str(item) for item in value)
+
+        row.append(value)
+
+    return row
+
+def stream_csv(columns, rows, chunk_rows=500):
+    """CSV text in chunks of <chunk_rows> rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for idx, row in enumerate(rows, 1):
+        writer.writerow(row)
+
+        if idx % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+def stream_xlsx(sheets, chunk_size=64 * 1024):
+    """Workbook with one sheet per (name, columns, rows), written in constant_memory mode to a temp file and read back in chunks.
+
+    Not streamed while it is built -- a zip can only be sent once it is complete, so the first byte
+    goes out after the last row is written. Sheets over XLSX_MAX_ROWS continue in "<name> (2)", ...
+    """
+    import xlsxwriter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "export.xlsx")
+
+        # constant_memory flushes every row to disk as soon as the next one starts
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+        bold = workbook.add_format({"bold": True})
+
+        for name, columns, rows in sheets:
+            sheet = workbook.add_worksheet(name)
+            sheet.write_row(0, 0, columns, bold)
+            part, idx = 1, 0
+
+            for row in rows:
+                idx += 1
+                # write_row silently drops rows past the limit
+                if idx == XLSX_MAX_ROWS:
+                    part, idx = part + 1, 1
+                    sheet = workbook.add_worksheet(f"{name} ({part})")
+                    sheet.write_row(0, 0, columns, bold)
+
+                sheet.write_row(idx, 0, row)
+
+        workbook.close()
+
+        with open(path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
@@ -0,0 +1,17 @@
+import os
+
+# gunicorn -c gunicorn.conf.py
+wsgi_app = "api:create_app()"
+
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Workers import the app themselves -- nothing is connected before fork
+preload_app = False
+
+
+def post_worker_init(worker):
+    # Optional -- open Mongo and fill in-process caches right after a worker boots
+    if os.getenv('WARM_UP', 'false').lower() == 'true':
+        from api import start_warm_up
+        start_warm_up()
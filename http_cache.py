@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import requests
+from urllib.parse import urlparse
+from requests.structures import CaseInsensitiveDict
+
+# Persistent GitHub response cache -- HTTP_CACHE_PATH=github_cache.db
+# One SQLite file in WAL mode, shared by every gunicorn worker and thread (each opens its own connection).
+# Only GET responses are cached, a failing cache never fails the request.
+
+HTTP_CACHE_PATH = os.getenv('HTTP_CACHE_PATH')                          # Unset -- no cache
+HTTP_CACHE_MAX_MB = float(os.getenv('HTTP_CACHE_MAX_MB', 256))          # Least recently used entries are evicted above this
+HTTP_CACHE_TTL = int(os.getenv('HTTP_CACHE_TTL', 300))                  # Seconds a mutable response is served without asking GitHub
+HTTP_CACHE_OFFLINE = os.getenv('HTTP_CACHE_OFFLINE', 'false').lower() == 'true'  # Replays -- serve any cached response as is
+
+TOUCH_INTERVAL = 60     # Seconds between access time updates of an entry -- hits mostly stay reads
+
+# Path -> policy, first match wins. Everything else is 'ttl'.
+#   permanent  -- never changes once fetched
+#   closed     -- permanent once the PR is closed or merged, 'ttl' before
+#   revalidate -- always asked again, a 304 costs no rate limit
+#   None       -- not cached
+POLICIES = [
+    (re.compile(r'/rate_limit$'), None),
+    (re.compile(r'/repos/[^/]+/[^/]+/commits/[0-9a-f]{40}$'), 'permanent'),
+    (re.compile(r'/repos/[^/]+/[^/]+/pulls/\d+$'), 'closed'),
+    (re.compile(r'/events$'), 'revalidate'),
+]
+
+_local = threading.local()
+
+
+def get_policy(url):
+    path = urlparse(url).path
+    for pattern, policy in POLICIES:
+        if pattern.search(path):
+            return policy
+
+    return 'ttl'
+
+def cache_key(url, headers):
+    # Accept decides the shape of the body, the token what the response may contain
+    headers = headers or {}
+    raw = f"{url}\n{headers.get('Accept', '')}\n{headers.get('Authorization', '')}"
+
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def to_response(url, entry):
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.headers = CaseInsensitiveDict(json.loads(entry['headers']))
+    response._content = entry['body']
+    response.encoding = 'utf-8'
+    response.url = url
+    response.from_cache = True
+
+    return response
+
+class ResponseCache:
+    """SQLite store of GitHub responses, keyed by URL, Accept and token."""
+
+    def __init__(self, path):
+        self.path = path
+        # Writers of other workers hold the lock briefly -- wait for it instead of failing
+        self.db = sqlite3.connect(path, timeout=10, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+
+        # One worker sets up the schema at a time -- the size total must not miss a concurrent write
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.create_schema()
+            self.db.execute('COMMIT')
+        except Exception:
+            self.db.execute('ROLLBACK')
+            raise
+
+    def create_schema(self):
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                permanent INTEGER,
+                stored_at REAL,
+                accessed_at REAL,
+                size INTEGER
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+
+        # Running size of the cache, kept by triggers -- eviction checks never scan the table
+        self.db.execute('CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER)')
+        self.db.execute('''
+            INSERT OR IGNORE INTO cache_size SELECT 0, COALESCE(SUM(size), 0) FROM responses
+            WHERE NOT EXISTS (SELECT 1 FROM cache_size)
+        ''')
+        self.db.execute('''
+            CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses
+            BEGIN UPDATE cache_size SET total = total + NEW.size; END
+        ''')
+        self.db.execute('''
+            CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses
+            BEGIN UPDATE cache_size SET total = total + NEW.size - OLD.size; END
+        ''')
+        self.db.execute('''
+            CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses
+            BEGIN UPDATE cache_size SET total = total - OLD.size; END
+        ''')
+
+    def get(self, key):
+        entry = self.db.execute('SELECT * FROM responses WHERE key = ?', (key,)).fetchone()
+
+        if entry and time.time() - entry['accessed_at'] > TOUCH_INTERVAL:
+            self.db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+
+        return entry
+
+    def is_fresh(self, entry, policy):
+        if HTTP_CACHE_OFFLINE or entry['permanent']:
+            return True
+        if policy == 'revalidate':
+            return False
+
+        return time.time() - entry['stored_at'] < HTTP_CACHE_TTL
+
+    def put(self, key, url, response, policy):
+        permanent = policy == 'permanent'
+        if policy == 'closed':
+            try:
+                permanent = response.json().get('state') == 'closed'
+            except ValueError:
+                permanent = False
+
+        now = time.time()
+        # Upsert, not REPLACE -- a replaced row would skip the delete trigger
+        self.db.execute(
+            '''INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (key) DO UPDATE SET url = excluded.url, status = excluded.status, headers = excluded.headers,
+                   body = excluded.body, etag = excluded.etag, last_modified = excluded.last_modified,
+                   permanent = excluded.permanent, stored_at = excluded.stored_at,
+                   accessed_at = excluded.accessed_at, size = excluded.size''',
+            (key, url, response.status_code, json.dumps(dict(response.headers)), response.content,
+             response.headers.get('ETag'), response.headers.get('Last-Modified'), int(permanent),
+             now, now, len(response.content))
+        )
+        self.evict()
+
+    def renew(self, key):
+        """A 304 -- the stored body is current again."""
+        now = time.time()
+        self.db.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key))
+
+    def evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its limit."""
+        limit = HTTP_CACHE_MAX_MB * 1024 * 1024
+        total = self.db.execute('SELECT total FROM cache_size').fetchone()[0]
+        if total <= limit:
+            return
+
+        # IMMEDIATE -- two workers must not evict the same rows twice
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            excess = self.db.execute('SELECT total FROM cache_size').fetchone()[0] - 0.9 * limit
+            keys = []
+            for row in self.db.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+                if excess <= 0:
+                    break
+                keys.append(row['key'])
+                excess -= row['size']
+
+            self.db.executemany('DELETE FROM responses WHERE key = ?', [(key,) for key in keys])
+            self.db.execute('COMMIT')
+        except Exception:
+            self.db.execute('ROLLBACK')
+            raise
+
+        print(f"HTTP Cache -- evicted {len(keys)} responses")
+
+def get_response_cache():
+    """Cache connection of the current thread, None if the cache is off or can't be opened."""
+    if not HTTP_CACHE_PATH:
+        return None
+
+    if getattr(_local, 'pid', None) != os.getpid():
+        _local.pid = os.getpid()
+        try:
+            _local.cache = ResponseCache(HTTP_CACHE_PATH)
+        except sqlite3.Error as e:
+            # Not retried by this thread -- every GET would pay for the failed open again
+            print(f"HTTP Cache Disabled -- {HTTP_CACHE_PATH}: {e}")
+            _local.cache = None
+
+    return _local.cache
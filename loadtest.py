@@ -0,0 +1,398 @@
+import os
+import sys
+import json
+import hashlib
+import time
+import random
+import signal
+import argparse
+import threading
+import subprocess
+import requests
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Load test for the dashboard routes under gunicorn.
+#
+#   python loadtest.py --spawn --mongo-uri mongodb://localhost:27017 --concurrency 32 --duration 60
+#
+# GitHub is replaced by a local stand-in (with configurable latency) and the app writes to its own
+# Mongo database, so a run costs no API quota and can be repeated. The report has throughput,
+# p50 / p95 / p99 latency and errors per route, and per gunicorn worker how busy it was and whether
+# that time went to GitHub, Mongo or the app itself (JSON serialization included).
+
+ROUTES = {
+    "user": "/{user}",
+    "repos": "/{user}/repos",
+    "contributions": "/{user}/contributions",
+    "repo_details": "/{user}/{repo}/repo_details",
+}
+
+
+# GITHUB STAND-IN ------------------------------->
+
+class FakeGitHub:
+    """Deterministic users, repos, commits, PRs and issues shaped like GitHub's REST / GraphQL responses."""
+
+    def __init__(self, users, repos_per_user, items, latency):
+        self.users = [f"user{idx}" for idx in range(users)]
+        self.repos_per_user = repos_per_user
+        self.items = items
+        self.latency = latency / 1000
+        self.created = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def account(self, login):
+        return {"login": login, "id": abs(hash(login)) % 10**8, "node_id": f"U_{login}", "html_url": f"https://github.com/{login}",
+                "name": login, "email": None, "public_repos": self.repos_per_user}
+
+    def repo(self, owner, name):
+        return {
+            "id": abs(hash(f"{owner}/{name}")) % 10**8, "name": name, "full_name": f"{owner}/{name}",
+            "description": "load test", "html_url": f"https://github.com/{owner}/{name}", "fork": False,
+            "archived": False, "created_at": self.created, "updated_at": self.created, "pushed_at": self.created,
+            "language": "Python", "owner": self.account(owner), "stargazers_count": 1, "watchers_count": 1,
+            "forks_count": 0, "open_issues_count": 0, "default_branch": "main", "visibility": "public", "topics": [],
+        }
+
+    def commit(self, full_name, sha):
+        owner = full_name.split('/')[0]
+        return {
+            "sha": sha, "html_url": f"https://github.com/{full_name}/commit/{sha}",
+            "commit": {"message": f"Commit {sha}\n\nBody", "author": {"name": owner, "email": f"{owner}@example.com", "date": self.created},
+                       "committer": {"date": self.created}},
+            "author": {"login": owner},
+            "stats": {"additions": 10, "deletions": 2, "total": 12},
+            "files": [{"filename": f"file{idx}.py", "additions": 5, "deletions": 1} for idx in range(2)],
+        }
+
+    def pull(self, full_name, number):
+        owner = full_name.split('/')[0]
+        return {
+            "number": number, "title": f"PR {number}", "state": "open", "merged": False,
+            "html_url": f"https://github.com/{full_name}/pull/{number}", "created_at": self.created, "updated_at": self.created,
+            "user": {"login": owner}, "assignee": None, "assignees": [], "requested_reviewers": [], "labels": [],
+            "comments": 0, "review_comments": 0, "commits": 1, "additions": 10, "deletions": 2, "changed_files": 2,
+            "commits_url": f"/repos/{full_name}/pulls/{number}/commits",
+        }
+
+    def issue(self, full_name, number):
+        owner = full_name.split('/')[0]
+        return {"number": number, "title": f"Issue {number}", "state": "open", "created_at": self.created,
+                "updated_at": self.created, "labels": [], "user": {"login": owner}, "assignees": []}
+
+    def graphql(self, payload):
+        variables = payload.get("variables", {})
+
+        # Commit history of a branch (COMMIT_MODE=lite) -- a single page
+        if "branch" in variables:
+            full_name = f"{variables['owner']}/{variables['name']}"
+            nodes = [{"oid": hashlib.sha1(f"{full_name}/{idx}".encode()).hexdigest(), "messageHeadline": f"Commit {idx}",
+                      "committedDate": self.created, "url": f"https://github.com/{full_name}/commit/{idx}",
+                      "additions": 10, "deletions": 2, "changedFilesIfAvailable": 2, "author": {"name": variables['owner']}}
+                     for idx in range(self.items)]
+            history = {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": nodes}
+            return {"data": {"repository": {"ref": {"target": {"history": history}}}}}
+
+        data = {}
+        for key, login in variables.items():
+            # l0, l1, ... are contribution aliases, q0, q1, ... email searches
+            if key.startswith("l"):
+                days = [{"date": (datetime.utcnow().date() - timedelta(days=offset)).isoformat(), "contributionCount": offset % 4}
+                        for offset in range(365, -1, -1)]
+                weeks = [{"contributionDays": days[idx:idx + 7]} for idx in range(0, len(days), 7)]
+                data[f"u{key[1:]}"] = {"contributionsCollection": {"contributionCalendar": {"weeks": weeks}}}
+            elif key.startswith("q"):
+                data[f"e{key[1:]}"] = {"nodes": []}
+
+        return {"data": data}
+
+    def route(self, path, query):
+        """(status, body, headers) for a GET."""
+        parts = [part for part in path.split('/') if part]
+        page = int(query.get('page', ['1'])[0])
+        first_page = page == 1
+
+        match parts:
+            case ["rate_limit"]:
+                return 200, {"rate": {"limit": 5000, "remaining": 5000, "reset": int(time.time()) + 3600}}, {}
+            case ["search", "users"]:
+                return 200, {"total_count": 0, "items": []}, {}
+            case ["users", login]:
+                return 200, self.account(login), {}
+            case ["users", login, "repos"]:
+                repos = [self.repo(login, f"repo{idx}") for idx in range(self.repos_per_user)]
+                return 200, repos if first_page else [], {}
+            case ["users", login, "events"]:
+                # One event per repo -- stored snapshots match, so updates find the repo up to date
+                events = [{"id": f"{login}-{idx}", "type": "PushEvent", "created_at": self.created,
+                           "repo": {"name": f"{login}/repo{idx}"}, "payload": {"commits": []}}
+                          for idx in range(self.repos_per_user)]
+                return 200, events if first_page else [], {}
+            case ["repos", owner, name]:
+                return 200, self.repo(owner, name), {}
+            case ["repos", owner, name, "topics"]:
+                return 200, {"names": []}, {}
+            case ["repos", owner, name, "branches"]:
+                return 200, [{"name": "main"}], {}
+            case ["repos", owner, name, "commits"]:
+                shas = [hashlib.sha1(f"{owner}/{name}/{idx}".encode()).hexdigest() for idx in range(self.items)]
+                return 200, [{"sha": sha} for sha in shas] if first_page else [], {}
+            case ["repos", owner, name, "commits", sha]:
+                return 200, self.commit(f"{owner}/{name}", sha), {}
+            case ["repos", owner, name, "issues"]:
+                return 200, [self.issue(f"{owner}/{name}", idx) for idx in range(1, self.items + 1)] if first_page else [], {}
+            case ["repos", owner, name, "pulls"]:
+                return 200, [self.pull(f"{owner}/{name}", 1000 + idx) for idx in range(self.items)] if first_page else [], {}
+            case ["repos", owner, name, "pulls", number] if number.isdigit():
+                return 200, self.pull(f"{owner}/{name}", int(number)), {}
+            case ["repos", owner, name, "pulls", number, "commits"]:
+                return 200, [{"sha": f"pr{number}".ljust(40, "0"), "author": {"login": owner}}] if first_page else [], {}
+            case ["repos", owner, name, ("issues" | "pulls"), "comments"] | ["repos", owner, name, "pulls", _, "reviews", *_]:
+                return 200, [], {}
+
+        return 404, {"message": "Not Found"}, {}
+
+    def serve(self, port):
+        github = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def reply(self, status, body, headers):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                time.sleep(github.latency)
+                url = urlparse(self.path)
+                self.reply(*github.route(url.path, parse_qs(url.query)))
+
+            def do_POST(self):
+                time.sleep(github.latency)
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                self.reply(200, github.graphql(payload), {})
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        return server
+
+
+# APP UNDER TEST ------------------------------->
+
+def spawn_gunicorn(args, github_url):
+    env = {
+        **os.environ,
+        "GITHUB_API_URL": github_url,
+        "GITHUB_TOKEN": "loadtest",
+        "MONGO_URI": args.mongo_uri,
+        "MONGO_DB": args.mongo_db,
+        "TIMING_HEADERS": "true",
+        "GUNICORN_WORKERS": str(args.workers),
+        "GUNICORN_THREADS": str(args.threads),
+    }
+    command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{args.port}"]
+
+    process = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                               stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL)
+
+    # Ready once any route answers
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{args.port}/users/resolve", timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+
+    process.kill()
+    raise SystemExit("gunicorn did not start within 30s")
+
+def reset_database(args):
+    from pymongo import MongoClient
+
+    client = MongoClient(args.mongo_uri, serverSelectionTimeoutMS=5000)
+    client.drop_database(args.mongo_db)
+    client.close()
+
+
+# LOAD ------------------------------->
+
+def parse_mix(mix):
+    """'user=1,repo_details=4' -> {route: weight}"""
+    weights = {}
+    for part in mix.split(','):
+        route, _, weight = part.partition('=')
+        if route not in ROUTES:
+            raise SystemExit(f"Unknown route in mix: {route} -- choose from {', '.join(ROUTES)}")
+        weights[route] = float(weight or 1)
+
+    return weights
+
+def parse_server_timing(header):
+    timings = {}
+    for part in filter(None, (part.strip() for part in (header or "").split(','))):
+        name, _, duration = part.partition(';dur=')
+        timings[name] = float(duration) / 1000 if duration else 0.0
+
+    return timings
+
+def make_request(session, target, route, users, repos_per_user):
+    user = random.choice(users)
+    path = ROUTES[route].format(user=user, repo=f"repo{random.randrange(repos_per_user)}")
+
+    started = time.perf_counter()
+    try:
+        response = session.get(f"{target}{path}", timeout=120)
+        status = response.status_code
+        pid = response.headers.get("X-Worker-Pid")
+        timings = parse_server_timing(response.headers.get("Server-Timing"))
+    except requests.RequestException:
+        status, pid, timings = 0, None, {}
+
+    return route, time.perf_counter() - started, status, pid, timings
+
+def warm_up(target, users, repos_per_user):
+    """Build every (user, repo) once -- the measured run is then the steady state."""
+    session = requests.Session()
+    for user in users:
+        for idx in range(repos_per_user):
+            session.get(f"{target}/{user}/repo{idx}/repo_details", timeout=600)
+
+def run_load(args, target, users):
+    weights = parse_mix(args.mix)
+    routes, route_weights = list(weights), list(weights.values())
+
+    results = []
+    lock = threading.Lock()
+    deadline = time.time() + args.duration
+
+    def worker():
+        session = requests.Session()
+        local = []
+        while time.time() < deadline:
+            route = random.choices(routes, route_weights)[0]
+            local.append(make_request(session, target, route, users, args.repos))
+
+        with lock:
+            results.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results, time.perf_counter() - started
+
+
+# REPORT ------------------------------->
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def report(results, elapsed, args):
+    print(f"\n{len(results)} requests in {elapsed:.1f}s -- concurrency {args.concurrency}, "
+          f"{args.workers} workers x {args.threads} threads, GitHub latency {args.github_latency}ms\n")
+
+    by_route = defaultdict(list)
+    for result in results:
+        by_route[result[0]].append(result)
+
+    print(f"{'route':<15}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for route, rows in sorted(by_route.items()) + [("all", results)]:
+        latencies = [row[1] * 1000 for row in rows]
+        errors = sum(1 for row in rows if row[2] == 0 or row[2] >= 400)
+        print(f"{route:<15}{len(rows) / elapsed:>9.1f}{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+              f"{percentile(latencies, 99):>10.1f}{errors / max(len(rows), 1):>8.1%}")
+
+    # Busy time per worker against the thread-seconds it had available
+    workers = defaultdict(lambda: defaultdict(float))
+    for _, _, _, pid, timings in results:
+        if pid:
+            workers[pid]['requests'] += 1
+            for kind, seconds in timings.items():
+                workers[pid][kind] += seconds
+
+    if workers:
+        print(f"\n{'worker':<10}{'requests':>10}{'util':>8}{'github':>9}{'mongo':>9}{'app/json':>10}")
+        for pid, spent in sorted(workers.items()):
+            total = spent['total'] or 1e-9
+            print(f"{pid:<10}{int(spent['requests']):>10}{spent['total'] / (elapsed * args.threads):>8.0%}"
+                  f"{spent['github'] / total:>9.0%}{spent['mongo'] / total:>9.0%}{spent['app'] / total:>10.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard routes against a local GitHub stand-in.")
+    parser.add_argument("--target", help="Base URL of an already running app (started with TIMING_HEADERS=true and GITHUB_API_URL)")
+    parser.add_argument("--spawn", action="store_true", help="Start gunicorn against the stand-in and a local Mongo")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--mongo-db", default="dashboard_loadtest", help="Dropped before every spawned run")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the spawned app")
+    parser.add_argument("--github-port", type=int, default=8766)
+    parser.add_argument("--github-latency", type=float, default=50, help="Milliseconds added to each GitHub call")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, help="Threads per worker -- 4 if spawned, required with --target (for utilization)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Simultaneous clients")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of measured load")
+    parser.add_argument("--mix", default="user=1,repos=1,contributions=1,repo_details=4")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--repos", type=int, default=2, help="Repos per user")
+    parser.add_argument("--items", type=int, default=5, help="Commits / PRs / issues per repo")
+    parser.add_argument("--no-warmup", action="store_true", help="Measure cold builds too")
+    parser.add_argument("--verbose", action="store_true", help="Show gunicorn output")
+    args = parser.parse_args()
+
+    if not args.target and not args.spawn:
+        parser.error("use --spawn or --target")
+
+    if args.threads is None:
+        if not args.spawn:
+            parser.error("--target needs --threads, the threads per worker of the running app")
+        args.threads = 4
+
+    github = FakeGitHub(args.users, args.repos, args.items, args.github_latency)
+    github_server = github.serve(args.github_port)
+
+    process = None
+    if args.spawn:
+        reset_database(args)
+        process = spawn_gunicorn(args, f"http://127.0.0.1:{args.github_port}")
+        target = f"http://127.0.0.1:{args.port}"
+    else:
+        target = args.target.rstrip('/')
+
+    try:
+        if not args.no_warmup:
+            print("Warming up ...")
+            warm_up(target, github.users, args.repos)
+
+        print(f"Running for {args.duration:.0f}s ...")
+        results, elapsed = run_load(args, target, github.users)
+        report(results, elapsed, args)
+    finally:
+        if process:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
+        github_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import os
+import time
+import heapq
+from datetime import datetime, timedelta
+
+import api
+from clients import GitHubUnavailable, get_http
+
+# Background refresher -- python refresher.py
+# Keeps stored (user, repo) data fresh before anyone asks, so page views only read Mongo.
+# Run a single instance: the rate limit budget is global to the token.
+
+REFRESH_INTERVAL = int(os.getenv('REFRESH_INTERVAL', 15))        # Minutes before an entry counts as stale (keep <= REFRESH_FRESH_FOR)
+REFRESH_CYCLE = int(os.getenv('REFRESH_CYCLE', 60))              # Seconds between queue rebuilds
+REFRESH_RESERVE = int(os.getenv('REFRESH_RESERVE', 1000))        # Core requests always left for page views
+VIEW_HALF_LIFE = float(os.getenv('VIEW_HALF_LIFE', 3))           # Days for the weight of a view to halve
+DRIFT_GUARD = int(os.getenv('DRIFT_GUARD', 30))                  # Days without refresh before it is forced (events API keeps 90)
+
+
+def get_rate_budget():
+    """Core requests that may still be spent -- /rate_limit itself doesn't count against the limit."""
+    response = get_http().get(f"{api.BASE_URL}/rate_limit", headers=api.HEADERS)
+
+    if response.status_code == 200:
+        return response.json()['rate']['remaining'] - REFRESH_RESERVE
+    else:
+        print(f"Error fetching rate limit: {response.status_code} {response.text}")
+        return 0
+
+def priority(entry, now):
+    """Higher is refreshed first, below 1 is not due yet."""
+    last_refreshed = entry.get('last_refreshed') or datetime.min
+    last_viewed = entry.get('last_viewed') or datetime.min
+
+    staleness = (now - last_refreshed).total_seconds() / (REFRESH_INTERVAL * 60)
+
+    # Recently viewed and busy repos are worth more, idle ones still age in slowly
+    view_weight = 0.5 ** ((now - last_viewed).total_seconds() / (VIEW_HALF_LIFE * 86400))
+    activity_weight = min(entry.get('activity', 0.0), 10) / 10
+    score = staleness * max(view_weight + activity_weight, 0.01)
+
+    # Never let an entry drift out of the events window into a full rebuild
+    if now - last_refreshed > timedelta(days=DRIFT_GUARD):
+        score += 1000
+
+    return score
+
+def build_queue(now):
+    queue = []
+    for entry in api.refresh_queue.find({}):
+        score = priority(entry, now)
+        if score >= 1:
+            heapq.heappush(queue, (-score, entry['_id'], entry))
+
+    return queue
+
+def refresh_entry(entry):
+    username, repo = entry['login'], entry['repo']
+
+    db_user_data = api.collection.find_one({"user_info.login": username})
+    repo_details = db_user_data.get(repo) if db_user_data else None
+
+    # Removed since it was queued
+    if not repo_details:
+        api.refresh_queue.delete_one({'_id': entry['_id']})
+        return
+
+    # Webhook deliveries keep it fresh already
+    if api.has_active_webhook(repo_details['full_name']):
+        api.mark_refreshed(username, repo, 0)
+        return
+
+    # Keep whatever window was stored -- it may reach further back than the default
+    start_date = api.get_covered_since(repo_details)
+
+    print(f"Refreshing {username}/{repo}")
+    items_before = api.count_items(repo_details)
+    latest_repo_data = api.refresh_repo_details(username, repo, repo_details, start_date)
+
+    # Too far behind -- rebuild now instead of on the next page view
+    if latest_repo_data == 'redirect':
+        print(f"Rebuilding {username}/{repo}")
+        user_info = api.get_user_info(username)
+        parent_repo = api.get_repository(username, repo)
+
+        if not user_info or not parent_repo:
+            return
+
+        if parent_repo['fork'] and parent_repo.get('parent'):
+            parent_repo = parent_repo['parent']
+
+        api.build_repo_details(username, user_info, repo, parent_repo, start_date)
+        api.mark_refreshed(username, repo, 0)
+        return
+
+    api.mark_refreshed(username, repo, api.count_items(latest_repo_data) - items_before)
+
+def run_cycle():
+    # Webhook deliveries due for a retry, or left behind by a crashed worker
+    api.drain_webhook_deliveries()
+
+    queue = build_queue(datetime.utcnow())
+    budget = get_rate_budget() if queue else 0
+    refreshed = 0
+
+    while queue and budget > 0:
+        _, _, entry = heapq.heappop(queue)
+
+        try:
+            refresh_entry(entry)
+            refreshed += 1
+        except GitHubUnavailable as e:
+            print(f"GitHub unavailable, pausing refresh -- {e}")
+            break
+        except Exception as e:
+            print(f"Refresh Failed -- {entry['_id']}: {e}")
+
+        budget = get_rate_budget()
+
+    print(f"Refresh Cycle -- {refreshed} refreshed, {len(queue)} due, budget {budget}")
+
+def main():
+    while True:
+        try:
+            run_cycle()
+        except Exception as e:
+            print(f"Refresh Cycle Failed -- {e}")
+
+        time.sleep(REFRESH_CYCLE)
+
+
+if __name__ == '__main__':
+    main()
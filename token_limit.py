@@ -33,4 +33,5 @@ def check_rate_limit():
         print(f"Error fetching rate limit: {response.status_code} {response.text}")
 
 # Example usage
-check_rate_limit()
+if __name__ == '__main__':
+    check_rate_limit()